@@ -1,44 +1,85 @@
+import argparse
+import asyncio
+import json
+import sys
 import time
+from urllib.parse import urlparse
+
+from datetime import datetime
 from playwright.sync_api import sync_playwright
 
-def probe_beta_status():
+from probe_daemon import Schedule, TokenBucket, watch
+from probe_fetch import STORE_URL, TieredFetcher, TierStats
+from probe_matcher import ENGINES, build_matcher, load_dictionary
+from probe_replay import HarArchive, ReplayServer
+from probe_session import (
+    SESSION_PATH,
+    invalidate_session,
+    is_signed_in,
+    load_session,
+    save_session,
+)
+from probe_store import DEFAULT_TTL, STORE_PATH, ProbeStore
+
+
+
+def visible_text(page):
+    # Rendered text only: skips <script>, attributes and hidden nodes, which
+    # page.content() would drag into the scan
+    return page.inner_text("body")
+
+
+def probe_beta_status(session_path=SESSION_PATH, relogin=False, matcher=None):
     print("Initializing Recon Probe...")
+    matcher = matcher or build_matcher()
+    # Target: WhatsApp (often has beta program) or a known open beta
+    target_url = "https://play.google.com/store/apps/details?id=com.whatsapp"
+
     with sync_playwright() as p:
-        # Launch browser with head (visible) so user can interact
-        browser = p.chromium.launch(headless=False)
-        context = browser.new_context()
-        page = context.new_page()
+        state = None if relogin else load_session(session_path)
+        browser = context = page = None
+
+        if state is not None:
+            # Reuse the cached login headlessly; the scan page doubles as the check
+            print("Reusing cached session...")
+            browser = p.chromium.launch(headless=True)
+            context = browser.new_context(storage_state=state)
+            page = context.new_page()
+            print(f"Navigating to Target: {target_url}")
+            page.goto(target_url)
+            if not is_signed_in(page):
+                print("[STALE] Cached session was rejected. Falling back to interactive login.")
+                invalidate_session(session_path)
+                browser.close()
+                browser = None
+
+        if browser is None:
+            # Launch browser with head (visible) so user can interact
+            browser = p.chromium.launch(headless=False)
+            context = browser.new_context()
+            page = context.new_page()
+
+            print(f"Navigating to Target: {target_url}")
+            page.goto(target_url)
 
-        # Target: WhatsApp (often has beta program) or a known open beta
-        target_url = "https://play.google.com/store/apps/details?id=com.whatsapp"
-        
-        print(f"Navigating to Target: {target_url}")
-        page.goto(target_url)
+            print("\n[INSTRUCTION]: Please log in to your Google Account in the browser window if not logged in.")
+            print("[INSTRUCTION]: Once logged in (or if you want to test as guest), press ENTER in this terminal to scan.")
+            input("Press Enter to execute scan...")
 
-        print("\n[INSTRUCTION]: Please log in to your Google Account in the browser window if not logged in.")
-        print("[INSTRUCTION]: Once logged in (or if you want to test as guest), press ENTER in this terminal to scan.")
-        input("Press Enter to execute scan...")
+            if is_signed_in(page):
+                save_session(context.storage_state(), session_path)
+                print(f"Session cached to {session_path}")
 
         print("Scanning page for Beta indicators...")
-        
-        # Look for common text patterns
-        content = page.content()
-        
-        indicators = [
-            "Join the beta",
-            "You're a beta tester",
-            "Beta program is full",
-            "Leave the beta",
-            "Become a tester"
-        ]
-        
-        found = False
-        for indicator in indicators:
-            if indicator in content:
-                print(f"[SUCCESS] Detected Signal: '{indicator}'")
-                found = True
-        
-        if not found:
+
+        result = matcher.match(visible_text(page))
+        for match in result["matches"]:
+            print(f"[SUCCESS] Detected Signal: '{match['phrase']}' "
+                  f"({match['category']}, {match['locale']}) at offset {match['start']}")
+
+        if result["status"]:
+            print(f"[VERDICT] Beta status: {result['status']} (confidence {result['confidence']:.2f})")
+        else:
             print("[NEGATIVE] No beta indicators found. This might mean:")
             print("1. You are not logged in.")
             print("2. The app has no public beta.")
@@ -47,8 +88,286 @@ def probe_beta_status():
         # Optional: Dump screenshots for analysis
         page.screenshot(path="experiments/beta_probe_result.png")
         print("Visual confirmation saved to experiments/beta_probe_result.png")
-        
+
         browser.close()
 
+
+# --- Batch Mode ---
+# Sweeps many package IDs at once through the tiered fetcher (probe_fetch.py):
+# a keep-alive HTTP fetch first, a pooled browser context only when the static
+# page can't decide. Every request waits for its host's rate-limit slot first,
+# so raising the concurrency never raises the request rate against Google.
+
+def read_package_ids(source):
+    # One package ID per line; blank lines and '#' comments are ignored.
+    # '-' reads from stdin so the list can be piped in from adb.
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        package_ids = []
+        for line in stream:
+            line = line.split("#", 1)[0].strip()
+            if line and line not in package_ids:
+                package_ids.append(line)
+        return package_ids
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class HostRateLimiter:
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url):
+        host = urlparse(url).netloc
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def run_batch(package_ids, concurrency=4, rate=2.0, headless=True, storage_state=None,
+                    matcher=None, tiers=("http", "browser"), verify_negatives=False, stats=None,
+                    **fetcher_options):
+    # Async generator: yields one record per package as soon as it finishes.
+    # Pass a TierStats as `stats` to collect per-tier hit rates and timings;
+    # extra keyword arguments (store_url, recorder, offline) go to TieredFetcher.
+    fetcher = TieredFetcher(
+        matcher or build_matcher(),
+        HostRateLimiter(rate),
+        tiers=tiers,
+        storage_state=storage_state,
+        headless=headless,
+        concurrency=concurrency,
+        verify_negatives=verify_negatives,
+        **fetcher_options,
+    )
+    if stats is not None:
+        fetcher.stats = stats
+    concurrency = max(1, min(concurrency, len(package_ids)))
+    pending = asyncio.Queue()
+    for package_id in package_ids:
+        pending.put_nowait(package_id)
+    results = asyncio.Queue()
+
+    async def worker():
+        while True:
+            try:
+                package_id = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                record = await fetcher.fetch(package_id)
+            except Exception as e:
+                record = {"package_id": package_id, "status": "error", "error": str(e)}
+            await results.put(record)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        for _ in range(len(package_ids)):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        await fetcher.close()
+
+
+async def sweep(source, concurrency, rate, headless=True, session_path=SESSION_PATH, matcher=None,
+                store=None, full=False, tiers=("http", "browser"), verify_negatives=False,
+                trace_path=None, **fetcher_options):
+    package_ids = read_package_ids(source)
+    if store is not None and not full:
+        # Incremental sweep: skip packages whose last good scan is still within its TTL
+        due = store.due(package_ids)
+        print(f"[BATCH] {len(package_ids) - len(due)} packages still fresh in the store, skipping",
+              file=sys.stderr)
+        package_ids = due
+    if not package_ids:
+        return
+    state = load_session(session_path)
+    if state is None:
+        print("[BATCH] No valid cached session; scanning as guest. "
+              "Run without --batch once to log in.", file=sys.stderr)
+    print(f"[BATCH] Sweeping {len(package_ids)} packages "
+          f"({concurrency} contexts, {rate}/s per host)", file=sys.stderr)
+    started = time.perf_counter()
+    hits = 0
+    rejected = 0
+    changes = 0
+    stats = TierStats(trace_path)
+    async for record in run_batch(package_ids, concurrency, rate, headless, state, matcher,
+                                  tiers, verify_negatives, stats, **fetcher_options):
+        if store is not None:
+            record["changed"] = store.save(record)
+            changes += record["changed"]
+        if record.get("indicators"):
+            hits += 1
+        if state is not None and record.get("signed_in") is False:
+            rejected += 1
+        # One JSON record per line on stdout so results can be piped onward
+        print(json.dumps(record), flush=True)
+    print(f"[BATCH] Done in {time.perf_counter() - started:.1f}s, "
+          f"{hits}/{len(package_ids)} packages showed beta signals", file=sys.stderr)
+    if store is not None:
+        print(f"[BATCH] {changes} packages changed since their last scan", file=sys.stderr)
+    for line in stats.report():
+        print(line, file=sys.stderr)
+    if rejected:
+        invalidate_session(session_path)
+        print(f"[STALE] Cached session was rejected on {rejected} pages and has been cleared. "
+              "Run without --batch to log in again.", file=sys.stderr)
+
+
+def parse_since(value):
+    # Epoch seconds or an ISO 8601 timestamp
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def print_changes(store, since, status_only=False):
+    for row in store.changed_since(since, status_only):
+        print(json.dumps(row))
+
+
+def replay_batch(args, matcher):
+    # Offline sweep against a local stand-in serving a recorded archive. The
+    # result store is left alone so every replay fetches every package.
+    archive = HarArchive.load(args.replay)
+    with ReplayServer(archive, args.replay_latency, args.seed) as server:
+        print(f"[REPLAY] Serving {len(archive.entries)} recorded listings from {server.base_url} "
+              f"(latency: {args.replay_latency})", file=sys.stderr)
+        asyncio.run(sweep(args.batch, args.concurrency, args.rate,
+                          headless=not args.headed, session_path=args.session, matcher=matcher,
+                          tiers=args.tiers.split(","), verify_negatives=args.verify_negatives,
+                          trace_path=args.trace, store_url=server.store_url(STORE_URL), offline=True))
+        print(f"[REPLAY] {server.hits} hits, {server.misses} misses", file=sys.stderr)
+
+
+def watch_mode(args, matcher):
+    # Long-running scheduler over the watchlist (probe_daemon.py); stop with Ctrl+C
+    if args.no_store:
+        print("[WATCH] Watch mode keeps its state in the result store; drop --no-store.", file=sys.stderr)
+        return
+    schedule = Schedule(base=args.interval * 3600, min_interval=args.min_interval * 60,
+                        max_interval=args.max_interval * 3600)
+    state = load_session(args.session)
+    if state is None:
+        print("[WATCH] No valid cached session; scanning as guest.", file=sys.stderr)
+    limiter = TokenBucket(args.global_rate, args.burst, inner=HostRateLimiter(args.rate))
+    fetcher_options = {}
+    server = None
+    if args.replay:
+        server = ReplayServer(HarArchive.load(args.replay), args.replay_latency, args.seed).start()
+        fetcher_options = {"store_url": server.store_url(STORE_URL), "offline": True}
+    # Like replay sweeps, a replayed watch never touches the real result store
+    store = ProbeStore(":memory:" if args.replay else args.store)
+    try:
+        asyncio.run(watch(args.watch, store, matcher, limiter, args.concurrency,
+                          headless=not args.headed, storage_state=state, tiers=args.tiers.split(","),
+                          verify_negatives=args.verify_negatives, schedule=schedule,
+                          events_path=args.events, session_path=args.session, run_for=args.run_for,
+                          trace_path=args.trace, **fetcher_options))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+        if server is not None:
+            server.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Probe Play Store listings for beta programs.")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="file of package IDs (one per line), or '-' for stdin")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="number of browser contexts working in parallel (default: 4)")
+    parser.add_argument("--rate", type=float, default=2.0,
+                        help="max navigations per second per host, 0 for unlimited (default: 2)")
+    parser.add_argument("--headed", action="store_true", help="show the browser during a batch sweep")
+    parser.add_argument("--session", default=SESSION_PATH,
+                        help=f"cached login state file (default: {SESSION_PATH})")
+    parser.add_argument("--relogin", action="store_true",
+                        help="ignore the cached session and log in interactively")
+    parser.add_argument("--locales", help="comma-separated indicator locales to load (default: all)")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="regex",
+                        help="indicator matching engine (default: regex)")
+    parser.add_argument("--store", default=STORE_PATH,
+                        help=f"SQLite result store for incremental sweeps (default: {STORE_PATH})")
+    parser.add_argument("--no-store", action="store_true", help="don't read or write the result store")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL / 3600,
+                        help="hours a scan result stays fresh (default: 24)")
+    parser.add_argument("--full", action="store_true", help="rescan every package regardless of TTL")
+    parser.add_argument("--changed-since", metavar="T",
+                        help="print stored packages that changed since T (epoch or ISO time) and exit")
+    parser.add_argument("--status-only", action="store_true",
+                        help="with --changed-since, ignore content-only changes")
+    parser.add_argument("--tiers", default="http,browser",
+                        help="fetch tiers to use, in order: http, browser or both (default: http,browser)")
+    parser.add_argument("--verify-negatives", action="store_true",
+                        help="send listings with no static indicators to the browser tier as well")
+    parser.add_argument("--trace", metavar="JSONL",
+                        help="append per-fetch latency traces (see verification/trace_report.py)")
+    parser.add_argument("--record", metavar="HAR",
+                        help="save every listing fetched during the sweep into a HAR archive")
+    parser.add_argument("--replay", metavar="HAR",
+                        help="serve listings from a recorded HAR archive instead of the network")
+    parser.add_argument("--replay-latency", default="0", metavar="MS",
+                        help="replay delay per request: fixed ms, a 'low-high' range, "
+                             "or 'recorded' (default: 0)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for ranged replay latency")
+    parser.add_argument("--watch", metavar="FILE",
+                        help="keep checking a package watchlist (text, or a ReconScanner JSON export)")
+    parser.add_argument("--interval", type=float, default=6,
+                        help="watch: starting hours between checks of a package (default: 6)")
+    parser.add_argument("--min-interval", type=float, default=15,
+                        help="watch: shortest minutes between checks of a busy package (default: 15)")
+    parser.add_argument("--max-interval", type=float, default=168,
+                        help="watch: longest hours between checks of a quiet package (default: 168)")
+    parser.add_argument("--global-rate", type=float, default=0.5,
+                        help="watch: max requests per second across all hosts, 0 for unlimited (default: 0.5)")
+    parser.add_argument("--burst", type=int, default=5, help="watch: requests allowed in a burst (default: 5)")
+    parser.add_argument("--events", metavar="JSONL", help="watch: also append change events to this file")
+    parser.add_argument("--run-for", type=float, metavar="SECONDS", help="watch: stop after this long")
+    args = parser.parse_args(argv)
+
+    if args.changed_since:
+        with ProbeStore(args.store) as store:
+            print_changes(store, parse_since(args.changed_since), args.status_only)
+        return
+
+    locales = args.locales.split(",") if args.locales else None
+    matcher = build_matcher(load_dictionary(locales), args.engine)
+
+    if args.watch:
+        watch_mode(args, matcher)
+    elif args.batch and args.replay:
+        replay_batch(args, matcher)
+    elif args.batch:
+        recorder = HarArchive(args.record) if args.record else None
+        store = None if args.no_store else ProbeStore(args.store, ttl=args.ttl * 3600)
+        try:
+            asyncio.run(sweep(args.batch, args.concurrency, args.rate,
+                              headless=not args.headed, session_path=args.session, matcher=matcher,
+                              store=store, full=args.full, tiers=args.tiers.split(","),
+                              verify_negatives=args.verify_negatives, trace_path=args.trace,
+                              recorder=recorder))
+        finally:
+            if store is not None:
+                store.close()
+            if recorder is not None:
+                recorder.save()
+                print(f"[RECORD] {len(recorder.entries)} listings saved to {args.record}", file=sys.stderr)
+    else:
+        probe_beta_status(args.session, args.relogin, matcher)
+
+
 if __name__ == "__main__":
-    probe_beta_status()
+    main()
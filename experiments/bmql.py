@@ -0,0 +1,533 @@
+import argparse
+import ast
+import json
+import re
+import sys
+from collections import OrderedDict
+
+from firestore_rest import to_value
+
+# BMQL (Beta Max Query Language) -> Firestore. The Query Core's LLM step emits
+# BMQL; this parses it, normalizes it into a canonical plan (literals pulled out
+# into slots, filters in a fixed order) and compiles that into a Firestore
+# structuredQuery. Plans are cached by their canonical shape, so the same query
+# with different values is only compiled once, and every plan is checked
+# against the composite indexes declared in firestore.indexes.json.
+#
+#   FIND anomalies WHERE severity IN ("HIGH", "CRITICAL") AND missionId = $mission
+#       ORDER BY createdAt DESC LIMIT 20
+#
+# Operators: = != < <= > >= IN, NOT IN, CONTAINS (array), CONTAINS ANY, and ~
+# (case-insensitive substring, which Firestore can't do: filtered client-side).
+
+INDEXES_PATH = "firestore.indexes.json"
+CACHE_SIZE = 256
+
+# The queries the apps run today (and the Query Core's example), for --advise
+APP_QUERIES = [
+    # ExternalBetasPage.jsx
+    'FIND missions WHERE type = "COMMUNITY" ORDER BY createdAt DESC',
+    # App.jsx anomaly feed
+    "FIND anomalies ORDER BY timestamp DESC",
+    # Dashboard.jsx, developer and tester views
+    "FIND missions WHERE architectId = $uid",
+    'FIND missions WHERE status = "ACTIVE"',
+    # MissionDetailsPage.jsx enrollment check
+    "FIND enrollments WHERE missionId = $mission AND userId = $uid",
+    # Mission feedback tab and the architect's triage view
+    "FIND anomalies WHERE missionId = $mission ORDER BY createdAt DESC LIMIT 50",
+    'FIND anomalies WHERE architectId = $uid AND status = "OPEN" ORDER BY createdAt DESC',
+    # "Show me all critical crashes in the Titan OS beta."
+    'FIND anomalies WHERE severity = "CRITICAL" AND missionName = "Titan OS" AND title ~ "crash"',
+]
+
+
+class BMQLError(ValueError):
+    pass
+
+
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<param>\$[A-Za-z_]\w*)
+      | (?P<op>==|!=|<=|>=|=|<|>|~)
+      | (?P<punct>[(),])
+      | (?P<word>[A-Za-z_][\w.]*)
+    )""", re.VERBOSE)
+
+KEYWORDS = {"FIND", "WHERE", "AND", "ORDER", "BY", "ASC", "DESC", "LIMIT",
+            "IN", "NOT", "CONTAINS", "ANY", "TRUE", "FALSE", "NULL"}
+
+# BMQL operator -> Firestore FieldFilter op; "~" has no Firestore equivalent
+OPERATORS = {
+    "=": "EQUAL", "==": "EQUAL", "!=": "NOT_EQUAL",
+    "<": "LESS_THAN", "<=": "LESS_THAN_OR_EQUAL", ">": "GREATER_THAN", ">=": "GREATER_THAN_OR_EQUAL",
+    "IN": "IN", "NOT IN": "NOT_IN", "CONTAINS": "ARRAY_CONTAINS", "CONTAINS ANY": "ARRAY_CONTAINS_ANY",
+    "~": "SUBSTRING",
+}
+EQUALITY = {"EQUAL", "IN"}
+ARRAY = {"ARRAY_CONTAINS", "ARRAY_CONTAINS_ANY"}
+INEQUALITY = {"NOT_EQUAL", "NOT_IN", "LESS_THAN", "LESS_THAN_OR_EQUAL", "GREATER_THAN", "GREATER_THAN_OR_EQUAL"}
+LIST_OPERATORS = {"IN", "NOT_IN", "ARRAY_CONTAINS_ANY"}
+
+
+class Param:
+    # $name placeholder, bound when the plan is executed
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"${self.name}"
+
+
+class Slot:
+    # Position of a literal pulled out of the query by canonicalize()
+    def __init__(self, index):
+        self.index = index
+
+    def __repr__(self):
+        return f"?{self.index}"
+
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            raise BMQLError(f"Unexpected input at {pos}: {text[pos:pos + 20]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "word" and value.upper() in KEYWORDS:
+            kind, value = "keyword", value.upper()
+        tokens.append((kind, value))
+        pos = match.end()
+    return tokens
+
+
+class Parser:
+    # query  := FIND name [WHERE cond (AND cond)*] [ORDER BY name [ASC|DESC] (, ...)*] [LIMIT value]
+    # cond   := name op value | name [NOT] IN list | name CONTAINS [ANY] value | name ~ value
+    # value  := string | number | TRUE | FALSE | NULL | $param | list
+    # list   := ( value (, value)* )
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self, value=None):
+        if self.pos >= len(self.tokens):
+            return None
+        token = self.tokens[self.pos]
+        return token if value is None or token[1] == value else None
+
+    def take(self, kind=None, value=None):
+        token = self.peek()
+        if token is None or (kind and token[0] != kind) or (value and token[1] != value):
+            found = token[1] if token else "end of query"
+            raise BMQLError(f"Expected {value or kind}, found {found!r}")
+        self.pos += 1
+        return token[1]
+
+    def parse(self):
+        self.take("keyword", "FIND")
+        query = {"collection": self.take("word"), "filters": [], "order": [], "limit": None}
+        if self.peek("WHERE"):
+            self.take()
+            query["filters"].append(self.condition())
+            while self.peek("AND"):
+                self.take()
+                query["filters"].append(self.condition())
+        if self.peek("ORDER"):
+            self.take()
+            self.take("keyword", "BY")
+            query["order"].append(self.ordering())
+            while self.peek(","):
+                self.take()
+                query["order"].append(self.ordering())
+        if self.peek("LIMIT"):
+            self.take()
+            query["limit"] = self.value()
+            if not isinstance(query["limit"], (int, Param)) or isinstance(query["limit"], bool):
+                raise BMQLError("LIMIT takes a whole number")
+        if self.peek() is not None:
+            raise BMQLError(f"Unexpected {self.peek()[1]!r} after query")
+        return query
+
+    def condition(self):
+        field = self.take("word")
+        token = self.peek()
+        if token and token[0] == "op":
+            op = self.take()
+        elif self.peek("NOT"):
+            self.take()
+            self.take("keyword", "IN")
+            op = "NOT IN"
+        elif self.peek("IN"):
+            op = self.take()
+        elif self.peek("CONTAINS"):
+            self.take()
+            op = "CONTAINS"
+            if self.peek("ANY"):
+                self.take()
+                op = "CONTAINS ANY"
+        else:
+            raise BMQLError(f"Expected an operator after {field!r}")
+        op = OPERATORS[op]
+        value = self.value()
+        if op in LIST_OPERATORS and not isinstance(value, (list, Param)):
+            raise BMQLError(f"{field}: {op} takes a list, e.g. (\"A\", \"B\")")
+        return (field, op, value)
+
+    def ordering(self):
+        field = self.take("word")
+        direction = "ASCENDING"
+        if self.peek("ASC") or self.peek("DESC"):
+            direction = "DESCENDING" if self.take() == "DESC" else "ASCENDING"
+        return (field, direction)
+
+    def value(self):
+        token = self.peek()
+        if token is None:
+            raise BMQLError("Expected a value, found end of query")
+        kind, raw = token
+        self.pos += 1
+        if raw == "(":
+            values = [self.value()]
+            while self.peek(","):
+                self.take()
+                values.append(self.value())
+            self.take("punct", ")")
+            return values
+        if kind in ("string", "number"):
+            try:
+                return ast.literal_eval(raw)
+            except (SyntaxError, ValueError):
+                raise BMQLError(f"Bad literal {raw!r}") from None
+        if kind == "param":
+            return Param(raw[1:])
+        if raw in ("TRUE", "FALSE", "NULL"):
+            return {"TRUE": True, "FALSE": False, "NULL": None}[raw]
+        raise BMQLError(f"Expected a value, found {raw!r}")
+
+
+def parse(text):
+    return Parser(text).parse()
+
+
+def canonicalize(query):
+    # -> (shape, template, values). The shape is the query text with every
+    # literal replaced by a ?N slot and the filters sorted: the plan cache key.
+    # The template is the parsed query with Slot objects in place of literals;
+    # values holds the literals in slot order. $params are kept as they are.
+    values = []
+
+    def slot(value):
+        if isinstance(value, Param):
+            return value
+        values.append(value)
+        return Slot(len(values) - 1)
+
+    template = {
+        "collection": query["collection"],
+        "filters": [(field, op, slot(value)) for field, op, value in sorted(
+            query["filters"], key=lambda f: (f[0], f[1]))],
+        "order": list(query["order"]),
+        "limit": None if query["limit"] is None else slot(query["limit"]),
+    }
+    parts = [f"FIND {template['collection']}"]
+    if template["filters"]:
+        parts.append("WHERE " + " AND ".join(f"{f} {op} {ref!r}" for f, op, ref in template["filters"]))
+    if template["order"]:
+        parts.append("ORDER BY " + ", ".join(f"{f} {d}" for f, d in template["order"]))
+    if template["limit"] is not None:
+        parts.append(f"LIMIT {template['limit']!r}")
+    return " ".join(parts), template, values
+
+
+class Plan:
+    # A compiled canonical query: which filters run in Firestore and which run
+    # client-side, the effective ordering, and the composite index it needs
+
+    def __init__(self, shape, template, exempt=()):
+        self.shape = shape
+        self.collection = template["collection"]
+        self.server = []
+        self.client = []
+        for field, op, ref in template["filters"]:
+            if op == "SUBSTRING" or field in exempt:
+                self.client.append((field, op, ref))
+            else:
+                self.server.append((field, op, ref))
+        self.limit = template["limit"]
+        self.order = list(template["order"])
+        # Firestore implicitly orders by inequality fields after the explicit order
+        ordered = {field for field, _ in self.order}
+        for field, op, _ in self.server:
+            if op in INEQUALITY and field not in ordered:
+                self.order.append((field, "ASCENDING"))
+                ordered.add(field)
+        # With client-side filters a server-side LIMIT would drop matching rows
+        self.client_limit = bool(self.client) and self.limit is not None
+        self.index = required_index(self)
+
+    def _resolve(self, ref, values, params):
+        if isinstance(ref, Slot):
+            return values[ref.index]
+        if ref.name not in params:
+            raise BMQLError(f"Missing value for ${ref.name}")
+        return params[ref.name]
+
+    def structured_query(self, values, params=None):
+        params = params or {}
+        filters = [
+            {"fieldFilter": {"field": {"fieldPath": field}, "op": op,
+                             "value": to_value(self._resolve(ref, values, params))}}
+            for field, op, ref in self.server
+        ]
+        query = {"from": [{"collectionId": self.collection}]}
+        if len(filters) == 1:
+            query["where"] = filters[0]
+        elif filters:
+            query["where"] = {"compositeFilter": {"op": "AND", "filters": filters}}
+        if self.order:
+            query["orderBy"] = [{"field": {"fieldPath": f}, "direction": d} for f, d in self.order]
+        if self.limit is not None and not self.client_limit:
+            query["limit"] = self._resolve(self.limit, values, params)
+        return query
+
+    def filter_rows(self, rows, values, params=None):
+        # Applies the client-side filters, then the limit, to fetched documents (dicts)
+        params = params or {}
+        for field, op, ref in self.client:
+            wanted = self._resolve(ref, values, params)
+            rows = [row for row in rows if _matches(row.get(field), op, wanted)]
+        if self.client_limit:
+            rows = rows[:self._resolve(self.limit, values, params)]
+        return rows
+
+
+def _matches(actual, op, wanted):
+    if op == "SUBSTRING":
+        return isinstance(actual, str) and str(wanted).lower() in actual.lower()
+    if op == "EQUAL":
+        return actual == wanted
+    if op == "IN":
+        return actual in wanted
+    if op == "NOT_EQUAL":
+        return actual is not None and actual != wanted
+    if op == "NOT_IN":
+        return actual is not None and actual not in wanted
+    if op == "ARRAY_CONTAINS":
+        return isinstance(actual, list) and wanted in actual
+    if op == "ARRAY_CONTAINS_ANY":
+        return isinstance(actual, list) and any(v in actual for v in wanted)
+    try:
+        return {"LESS_THAN": actual < wanted, "LESS_THAN_OR_EQUAL": actual <= wanted,
+                "GREATER_THAN": actual > wanted, "GREATER_THAN_OR_EQUAL": actual >= wanted}[op]
+    except TypeError:
+        return False
+
+
+def required_index(plan):
+    # The composite index the server-side part of a plan needs, as
+    # (unordered prefix, ordered suffix) of (fieldPath, mode) pairs, or None
+    # when the automatic single-field indexes are enough (one field, or only
+    # equality filters, which Firestore serves by merging single-field indexes)
+    equality = sorted({field for field, op, _ in plan.server if op in EQUALITY})
+    arrays = sorted({field for field, op, _ in plan.server if op in ARRAY})
+    order = [(field, direction) for field, direction in plan.order if field not in equality]
+    if not arrays and not order:
+        return None
+    if len(equality) + len(arrays) + len(order) <= 1:
+        return None
+    prefix = [(field, "ASCENDING") for field in equality] + [(field, "CONTAINS") for field in arrays]
+    return prefix, order
+
+
+def load_indexes(path=INDEXES_PATH):
+    # firestore.indexes.json allows // comments and trailing commas
+    with open(path, encoding="utf-8") as f:
+        lines = [line for line in f if not line.lstrip().startswith("//")]
+    return json.loads(re.sub(r",(\s*[}\]])", r"\1", "".join(lines)))
+
+
+class IndexAdvisor:
+    def __init__(self, indexes=None):
+        indexes = indexes or {}
+        self.declared = {}
+        for index in indexes.get("indexes", []):
+            if index.get("queryScope", "COLLECTION") != "COLLECTION":
+                continue
+            fields = [(f["fieldPath"], "CONTAINS" if f.get("arrayConfig") else f.get("order", "ASCENDING"))
+                      for f in index["fields"]]
+            self.declared.setdefault(index["collectionGroup"], []).append(fields)
+        # Fields whose automatic single-field indexes have been switched off
+        self.exempt = {}
+        for override in indexes.get("fieldOverrides", []):
+            if not override.get("indexes"):
+                self.exempt.setdefault(override["collectionGroup"], set()).add(override["fieldPath"])
+
+    @classmethod
+    def from_file(cls, path=INDEXES_PATH):
+        return cls(load_indexes(path))
+
+    def find(self, collection, index):
+        # A declared index serves the plan if it starts with the equality and
+        # array fields in any order (equality fields in either direction) and
+        # ends with exactly the ordered fields
+        prefix, order = index
+        wanted = sorted((field, mode == "CONTAINS") for field, mode in prefix)
+        for fields in self.declared.get(collection, []):
+            head = fields[:len(prefix)]
+            if (len(fields) == len(prefix) + len(order)
+                    and sorted((field, mode == "CONTAINS") for field, mode in head) == wanted
+                    and fields[len(prefix):] == order):
+                return fields
+        return None
+
+    def check(self, plan):
+        # -> {"status": "automatic" | "declared" | "missing", "index", "client_filters", "notes"}
+        advice = {"status": "automatic", "index": None, "notes": [],
+                  "client_filters": [f"{field} {op}" for field, op, _ in plan.client]}
+        for field, op, _ in plan.client:
+            if op == "SUBSTRING":
+                advice["notes"].append(f"{field} ~ is a substring match Firestore can't run; filtered client-side")
+            else:
+                advice["notes"].append(f"{field} has its single-field index exempted; filtered client-side")
+        if plan.client_limit:
+            advice["notes"].append("LIMIT is applied after the client-side filter; the server returns every match")
+        if plan.index is not None:
+            prefix, order = plan.index
+            advice["index"] = prefix + order
+            if self.find(plan.collection, plan.index):
+                advice["status"] = "declared"
+            else:
+                advice["status"] = "missing"
+                advice["suggestion"] = index_definition(plan.collection, prefix + order)
+        return advice
+
+
+def index_definition(collection, fields):
+    # The firestore.indexes.json entry for a required index
+    return {
+        "collectionGroup": collection,
+        "queryScope": "COLLECTION",
+        "fields": [
+            {"fieldPath": path, "arrayConfig": "CONTAINS"} if mode == "CONTAINS"
+            else {"fieldPath": path, "order": mode}
+            for path, mode in fields
+        ],
+    }
+
+
+class PlanCache:
+    # Two LRU levels: query text -> (shape, literal values), so a repeated query
+    # isn't even tokenized, and shape -> (Plan, index advice), so queries that
+    # differ only in their literals share one compiled, index-checked plan
+
+    def __init__(self, maxsize=CACHE_SIZE, advisor=None):
+        self.maxsize = maxsize
+        self.advisor = advisor or IndexAdvisor()
+        self._texts = OrderedDict()
+        self._plans = OrderedDict()
+        self.hits = 0
+        self.shape_hits = 0
+        self.misses = 0
+        # Per level: a text eviction only costs a re-parse, a plan eviction a recompile
+        self.evictions = {"texts": 0, "plans": 0}
+
+    def _get(self, cache, key):
+        entry = cache.get(key)
+        if entry is not None:
+            cache.move_to_end(key)
+        return entry
+
+    def _put(self, cache, level, key, entry):
+        cache[key] = entry
+        if len(cache) > self.maxsize:
+            cache.popitem(last=False)
+            self.evictions[level] += 1
+
+    def compile(self, text):
+        # -> (plan, advice, values)
+        cached = self._get(self._texts, text)
+        if cached is not None:
+            shape, values = cached
+            entry = self._get(self._plans, shape)
+            if entry is not None:
+                self.hits += 1
+                return entry[0], entry[1], values
+        shape, template, values = canonicalize(parse(text))
+        self._put(self._texts, "texts", text, (shape, values))
+
+        entry = self._get(self._plans, shape)
+        if entry is not None:
+            self.shape_hits += 1
+        else:
+            self.misses += 1
+            plan = Plan(shape, template, self.advisor.exempt.get(template["collection"], ()))
+            entry = (plan, self.advisor.check(plan))
+            self._put(self._plans, "plans", shape, entry)
+        return entry[0], entry[1], values
+
+    def info(self):
+        lookups = self.hits + self.shape_hits + self.misses
+        return {"hits": self.hits, "shape_hits": self.shape_hits, "misses": self.misses,
+                "text_evictions": self.evictions["texts"], "plan_evictions": self.evictions["plans"],
+                "plans": len(self._plans),
+                "hit_rate": round((self.hits + self.shape_hits) / lookups, 3) if lookups else 0.0}
+
+
+def print_advice(text, plan, advice):
+    icon = {"automatic": "[OK]", "declared": "[INDEX]", "missing": "[MISSING]"}[advice["status"]]
+    print(f"{icon} {text}")
+    print(f"    plan: {plan.shape}")
+    if advice["index"]:
+        fields = ", ".join(f"{path} {mode}" for path, mode in advice["index"])
+        print(f"    needs composite index ({fields}): {advice['status']}")
+    for note in advice["notes"]:
+        print(f"    note: {note}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile BMQL queries and check them against Firestore indexes.")
+    parser.add_argument("queries", nargs="*", help="BMQL queries (default: the queries the apps run)")
+    parser.add_argument("--indexes", default=INDEXES_PATH,
+                        help=f"index definitions to check against (default: {INDEXES_PATH})")
+    parser.add_argument("--explain", action="store_true", help="also print each compiled structuredQuery")
+    args = parser.parse_args(argv)
+
+    cache = PlanCache(advisor=IndexAdvisor.from_file(args.indexes))
+    missing = {}
+    client_side = 0
+    errors = 0
+    for text in args.queries or APP_QUERIES:
+        try:
+            plan, advice, values = cache.compile(text)
+        except BMQLError as e:
+            print(f"[ERROR] {text}\n    {e}")
+            errors += 1
+            continue
+        print_advice(text, plan, advice)
+        if args.explain:
+            params = {ref.name: f"<{ref.name}>" for _, _, ref in plan.server + plan.client
+                      if isinstance(ref, Param)}
+            if isinstance(plan.limit, Param):
+                params[plan.limit.name] = 0
+            print("    " + json.dumps({"structuredQuery": plan.structured_query(values, params)}))
+        if advice["status"] == "missing":
+            missing[json.dumps(advice["suggestion"], sort_keys=True)] = advice["suggestion"]
+        client_side += bool(plan.client)
+
+    print(f"\n{len(missing)} missing composite indexes, {client_side} queries filtered client-side")
+    if missing:
+        print("Add to firestore.indexes.json:")
+        print(json.dumps({"indexes": list(missing.values())}, indent=2))
+    return 1 if missing or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import json
+import os
+from datetime import datetime
+
+# Firestore REST helpers shared by the BMQL compiler and the emulator tooling
+# in verification/: the Value codec, the emulator endpoints and the project id.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRESTORE_HOST = os.environ.get("FIRESTORE_EMULATOR_HOST", "127.0.0.1:8080")
+AUTH_HOST = os.environ.get("FIREBASE_AUTH_EMULATOR_HOST", "127.0.0.1:9099")
+# The emulators accept "owner" as a bearer token that bypasses security rules
+OWNER_TOKEN = "owner"
+
+
+def default_project():
+    try:
+        with open(os.path.join(ROOT, ".firebaserc"), encoding="utf-8") as f:
+            return os.environ.get("GCLOUD_PROJECT") or json.load(f)["projects"]["default"]
+    except (OSError, ValueError, KeyError):
+        return os.environ.get("GCLOUD_PROJECT", "demo-betamax")
+
+
+def to_value(value):
+    # Python -> Firestore REST Value
+    if value is None:
+        return {"nullValue": None}
+    if isinstance(value, bool):
+        return {"booleanValue": value}
+    if isinstance(value, int):
+        return {"integerValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, datetime):
+        # Expects UTC
+        return {"timestampValue": value.strftime("%Y-%m-%dT%H:%M:%S.%fZ")}
+    if isinstance(value, dict):
+        return {"mapValue": {"fields": {k: to_value(v) for k, v in value.items()}}}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [to_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def from_value(value):
+    # Firestore REST Value -> Python (timestamps stay ISO strings)
+    kind, inner = next(iter(value.items()))
+    if kind == "integerValue":
+        return int(inner)
+    if kind == "mapValue":
+        return {k: from_value(v) for k, v in inner.get("fields", {}).items()}
+    if kind == "arrayValue":
+        return [from_value(v) for v in inner.get("values", [])]
+    return inner
+
+
+def from_document(document):
+    return {k: from_value(v) for k, v in document.get("fields", {}).items()}
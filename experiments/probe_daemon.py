@@ -0,0 +1,319 @@
+import asyncio
+import heapq
+import json
+import os
+import random
+import sys
+import time
+
+from probe_fetch import TieredFetcher, TierStats
+from probe_session import invalidate_session
+
+# --- Watch Mode ---
+# A long-running scheduler over a package watchlist. Every package has its own
+# next-check time in a priority queue; packages whose verdict keeps changing
+# are checked more often, quiet ones drift towards MAX_INTERVAL, and failures
+# back off exponentially. All fetches share one global token bucket, and an
+# event is emitted only when the beta status or the content hash (indicators +
+# What's New) actually moved.
+
+BASE_INTERVAL = 6 * 3600
+MIN_INTERVAL = 15 * 60
+MAX_INTERVAL = 7 * 24 * 3600
+BACKOFF_BASE = 60
+BACKOFF_MAX = 6 * 3600
+
+# Interval multipliers after a check that changed / didn't change anything
+SPEED_UP = 0.5
+SLOW_DOWN = 1.5
+JITTER = 0.1
+
+# How often the watchlist file is checked for edits
+RELOAD_EVERY = 30
+
+
+class TokenBucket:
+    # Global request budget: `rate` tokens per second, up to `burst` saved up.
+    # Waiters reserve their token up front (the balance may go negative), so
+    # they are served in arrival order. `inner` is another limiter (e.g. the
+    # per-host one) that is waited on first.
+
+    def __init__(self, rate, burst=1, inner=None):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.inner = inner
+        self._tokens = float(self.burst)
+        self._updated = None
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url=None):
+        if self.inner is not None:
+            await self.inner.wait(url)
+        if self.rate <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            if self._updated is not None:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class Schedule:
+    # Min-heap of (next_check_at, package_id). Removed or rescheduled packages
+    # leave stale heap entries behind; those are skipped when popped.
+
+    def __init__(self, base=BASE_INTERVAL, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX, rng=None):
+        self.base = base
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rng = rng or random.Random()
+        self.state = {}
+        self._heap = []
+
+    def __len__(self):
+        return len(self.state)
+
+    def add(self, package_id, next_check_at, interval=None, failures=0):
+        interval = min(self.max_interval, max(self.min_interval, interval or self.base))
+        self.state[package_id] = {"next_check_at": next_check_at, "interval": interval, "failures": failures}
+        heapq.heappush(self._heap, (next_check_at, package_id))
+
+    def remove(self, package_id):
+        self.state.pop(package_id, None)
+
+    def next_time(self):
+        while self._heap:
+            at, package_id = self._heap[0]
+            entry = self.state.get(package_id)
+            if entry is not None and entry["next_check_at"] == at:
+                return at
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now):
+        due = []
+        while self.next_time() is not None and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def done(self, package_id, outcome, now):
+        # outcome: "changed", "unchanged", "first" (first verdict ever, which
+        # says nothing about churn) or "error". Returns the new state, or
+        # None if the package left the watchlist while it was being checked.
+        entry = self.state.get(package_id)
+        if entry is None:
+            return None
+        if outcome == "error":
+            entry["failures"] += 1
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (entry["failures"] - 1))
+            delay *= self.rng.uniform(0.5, 1.0)
+        else:
+            factor = {"changed": SPEED_UP, "unchanged": SLOW_DOWN}.get(outcome, 1.0)
+            entry["failures"] = 0
+            entry["interval"] = min(self.max_interval, max(self.min_interval, entry["interval"] * factor))
+            delay = entry["interval"] * self.rng.uniform(1 - JITTER, 1 + JITTER)
+        entry["next_check_at"] = now + delay
+        heapq.heappush(self._heap, (entry["next_check_at"], package_id))
+        return entry
+
+
+def read_watchlist(path):
+    # Plain text (one package ID per line, '#' comments), a JSON array of
+    # package IDs or of ReconScanner DetectedBeta objects, or JSONL of those
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    stripped = content.lstrip()
+    if stripped.startswith("["):
+        items = json.loads(stripped)
+    elif stripped.startswith("{"):
+        items = [json.loads(line) for line in content.splitlines() if line.strip()]
+    else:
+        items = [line.split("#", 1)[0].strip() for line in content.splitlines()]
+
+    package_ids = []
+    for item in items:
+        package_id = (item.get("packageId") or item.get("package_id")) if isinstance(item, dict) else item
+        if package_id and package_id not in package_ids:
+            package_ids.append(package_id)
+    return package_ids
+
+
+def change_event(record, previous, now):
+    if previous is None or previous["fetched_at"] == 0:
+        kind = "discovered"
+    elif previous["beta_status"] != record.get("beta_status"):
+        kind = "status_changed"
+    else:
+        kind = "content_changed"
+    return {
+        "event": kind,
+        "package_id": record["package_id"],
+        "previous_status": previous["beta_status"] if previous else None,
+        "beta_status": record.get("beta_status"),
+        "confidence": record.get("confidence"),
+        "indicators": record.get("indicators", []),
+        "previous_hash": previous["content_hash"] if previous else None,
+        "content_hash": record.get("content_hash"),
+        "whats_new": record.get("whats_new"),
+        "tier": record.get("tier"),
+        "url": record.get("url"),
+        "detected_at": now,
+    }
+
+
+class ProbeDaemon:
+    def __init__(self, watchlist, store, fetcher, schedule, concurrency=4, events_path=None,
+                 session_path=None, signed_in=False):
+        self.watchlist = watchlist
+        self.store = store
+        self.fetcher = fetcher
+        self.schedule = schedule
+        self.concurrency = max(1, concurrency)
+        self.events_path = events_path
+        self.session_path = session_path
+        self.signed_in = signed_in
+        self.checks = 0
+        self.events = 0
+        self.errors = 0
+        self._watchlist_mtime = None
+        self._queue = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+
+    def reload(self, now):
+        # Picks up watchlist edits; new packages start from the store's history
+        try:
+            mtime = os.path.getmtime(self.watchlist)
+        except OSError as e:
+            print(f"[WATCH] Can't read watchlist: {e}", file=sys.stderr)
+            return
+        if mtime == self._watchlist_mtime:
+            return
+        self._watchlist_mtime = mtime
+        wanted = set(read_watchlist(self.watchlist))
+        saved = self.store.schedule()
+        added = [p for p in wanted if p not in self.schedule.state]
+        removed = [p for p in self.schedule.state if p not in wanted]
+        for package_id in removed:
+            self.schedule.remove(package_id)
+        for package_id in added:
+            row = saved.get(package_id)
+            if row is not None:
+                self.schedule.add(package_id, row["next_check_at"], row["interval"], row["failures"])
+                continue
+            previous = self.store.get(package_id)
+            if previous and previous["fetched_at"] and not previous["last_error"]:
+                # Scanned by an earlier sweep: due one base interval after that
+                self.schedule.add(package_id, previous["fetched_at"] + self.schedule.base)
+            else:
+                self.schedule.add(package_id, now)
+        if added or removed:
+            print(f"[WATCH] Watchlist: {len(self.schedule)} packages "
+                  f"(+{len(added)}, -{len(removed)})", file=sys.stderr)
+
+    def emit(self, event):
+        line = json.dumps(event)
+        print(line, flush=True)
+        if self.events_path:
+            with open(self.events_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    async def _dispatch(self):
+        last_reload = 0.0
+        while True:
+            now = time.time()
+            if now - last_reload >= RELOAD_EVERY:
+                self.reload(now)
+                last_reload = now
+            for package_id in self.schedule.pop_due(now):
+                self._queue.put_nowait(package_id)
+            next_at = self.schedule.next_time()
+            delay = RELOAD_EVERY if next_at is None else min(RELOAD_EVERY, max(0.0, next_at - time.time()))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _work(self):
+        while True:
+            package_id = await self._queue.get()
+            previous = self.store.get(package_id)
+            try:
+                record = await self.fetcher.fetch(package_id)
+            except Exception as e:
+                record = {"package_id": package_id, "status": "error", "error": str(e)}
+            self._finish(package_id, record, previous)
+
+    def _finish(self, package_id, record, previous):
+        now = time.time()
+        self.checks += 1
+        changed = self.store.save(record, now)
+        if record.get("status") in ("error", "undecided"):
+            # No verdict (failed, throttled, or inconclusive): back off and retry,
+            # never emit or adapt the interval from it
+            self.errors += 1
+            outcome = "error"
+        else:
+            first = previous is None or previous["fetched_at"] == 0
+            outcome = "first" if first else ("changed" if changed else "unchanged")
+        entry = self.schedule.done(package_id, outcome, now)
+        if entry is None:
+            return
+        self.store.save_schedule(package_id, entry["next_check_at"], entry["interval"], entry["failures"])
+
+        if outcome == "error":
+            print(f"[BACKOFF] {package_id} failed {entry['failures']}x ({record.get('error') or record['status']}), "
+                  f"retry in {(entry['next_check_at'] - now) / 60:.1f} min", file=sys.stderr)
+        elif changed:
+            self.events += 1
+            self.emit(change_event(record, previous, now))
+        if self.signed_in and record.get("signed_in") is False:
+            # Keep going as a guest; the next interactive run logs in again
+            self.signed_in = False
+            invalidate_session(self.session_path)
+            print("[STALE] Cached session was rejected and has been cleared; "
+                  "continuing as guest.", file=sys.stderr)
+        # A shorter interval may now be the earliest; let the dispatcher re-plan
+        self._wakeup.set()
+
+    async def run(self, run_for=None):
+        tasks = [asyncio.create_task(self._dispatch())]
+        tasks += [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        try:
+            if run_for:
+                await asyncio.sleep(run_for)
+            else:
+                await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.fetcher.close()
+
+
+async def watch(watchlist, store, matcher, limiter, concurrency=4, headless=True, storage_state=None,
+                tiers=("http", "browser"), verify_negatives=False, schedule=None, events_path=None,
+                session_path=None, run_for=None, trace_path=None, **fetcher_options):
+    fetcher = TieredFetcher(matcher, limiter, tiers=tiers, storage_state=storage_state, headless=headless,
+                            concurrency=concurrency, verify_negatives=verify_negatives, **fetcher_options)
+    fetcher.stats = TierStats(trace_path)
+    schedule = Schedule() if schedule is None else schedule
+    daemon = ProbeDaemon(watchlist, store, fetcher, schedule, concurrency, events_path,
+                         session_path, signed_in=storage_state is not None)
+    print(f"[WATCH] Watching {watchlist} ({concurrency} workers)", file=sys.stderr)
+    started = time.perf_counter()
+    try:
+        await daemon.run(run_for)
+    finally:
+        print(f"[WATCH] Stopped after {time.perf_counter() - started:.0f}s: {daemon.checks} checks, "
+              f"{daemon.events} change events, {daemon.errors} errors", file=sys.stderr)
+        for line in fetcher.stats.report():
+            print(line, file=sys.stderr)
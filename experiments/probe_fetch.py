@@ -0,0 +1,466 @@
+import asyncio
+import gzip
+import hashlib
+import http.client
+import json
+import threading
+import time
+import uuid
+import zlib
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+STORE_URL = "https://play.google.com/store/apps/details?id={package_id}&hl=en_US&gl=US"
+
+# Same desktop UA the Android ReconScanner sends with Jsoup
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+
+WHATS_NEW_HEADINGS = ("what's new", "novedades", "neuigkeiten", "nouveautés", "novidades")
+
+# The browser tier never needs pixels, only text
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+
+# --- HTTP Tier ---
+
+class HttpPool:
+    # Keep-alive connections, parked per host between requests. Requests run on
+    # worker threads (http.client is blocking) so the event loop stays free.
+
+    def __init__(self, max_idle_per_host=8, timeout=10):
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _checkout(self, scheme, host):
+        with self._lock:
+            idle = self._idle.get((scheme, host))
+            if idle:
+                return idle.pop()
+        if scheme == "http":
+            return http.client.HTTPConnection(host, timeout=self.timeout)
+        return http.client.HTTPSConnection(host, timeout=self.timeout)
+
+    def _checkin(self, scheme, host, conn):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, host), [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def get(self, url, headers=None):
+        parts = urlsplit(url)
+        path = parts.path + ("?" + parts.query if parts.query else "")
+        request_headers = {
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html",
+            "Accept-Encoding": "gzip, deflate",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Connection": "keep-alive",
+        }
+        request_headers.update(headers or {})
+
+        # A parked connection may have been closed by the server; retry once fresh
+        for attempt in range(2):
+            conn = self._checkout(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers=request_headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(parts.scheme, parts.netloc, conn)
+            return response.status, _decode(response, body)
+
+    async def fetch(self, url, headers=None):
+        return await asyncio.to_thread(self.get, url, headers)
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn in idle:
+                    conn.close()
+            self._idle.clear()
+
+
+def _decode(response, body):
+    encoding = (response.getheader("Content-Encoding") or "").lower()
+    if encoding == "gzip":
+        body = gzip.decompress(body)
+    elif encoding == "deflate":
+        body = zlib.decompress(body)
+    charset = response.headers.get_content_charset() or "utf-8"
+    return body.decode(charset, errors="replace")
+
+
+class ListingParser(HTMLParser):
+    # Pulls the rendered-equivalent text out of static HTML: skips script/style
+    # and [hidden] subtrees, remembers the first <h1> (the app title) and the
+    # text of the section under the "What's New" heading.
+
+    SKIP = {"script", "style", "noscript", "template", "svg"}
+    HEADINGS = {"h1", "h2", "h3"}
+    VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+            "source", "track", "wbr"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chunks = []
+        self.title = None
+        self.signed_out = False
+        self._skip_depth = 0
+        self._depth = 0
+        self._sections = []
+        self._heading = None
+        self._whats_new = None
+        self._whats_new_depth = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.VOID:
+            return
+        attrs = dict(attrs)
+        if tag == "a" and "accounts.google.com/ServiceLogin" in (attrs.get("href") or ""):
+            self.signed_out = True
+        if self._skip_depth or tag in self.SKIP or "hidden" in attrs:
+            self._skip_depth += 1
+            return
+        self._depth += 1
+        if tag == "section":
+            self._sections.append(self._depth)
+        if tag in self.HEADINGS:
+            self._heading = []
+            self._whats_new_depth = None
+
+    def handle_endtag(self, tag):
+        if tag in self.VOID:
+            return
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return
+        self._depth -= 1
+        if tag == "section" and self._sections:
+            self._sections.pop()
+        if tag in self.HEADINGS and self._heading is not None:
+            heading = " ".join(self._heading)
+            if tag == "h1" and self.title is None:
+                self.title = heading
+            if heading.replace("\u2019", "'").lower().startswith(WHATS_NEW_HEADINGS):
+                # Capture until the enclosing <section> closes (or the next heading)
+                self._whats_new = []
+                self._whats_new_depth = self._sections[-1] if self._sections else 0
+            self._heading = None
+        elif self._whats_new_depth is not None and self._depth < self._whats_new_depth:
+            self._whats_new_depth = None
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        text = " ".join(data.split())
+        if not text:
+            return
+        self.chunks.append(text)
+        if self._heading is not None:
+            self._heading.append(text)
+        elif self._whats_new_depth is not None:
+            self._whats_new.append(text)
+
+    @property
+    def whats_new(self):
+        return " ".join(self._whats_new) if self._whats_new is not None else None
+
+
+def parse_listing(html):
+    parser = ListingParser()
+    parser.feed(html)
+    parser.close()
+    return {
+        "title": parser.title,
+        "text": " ".join(parser.chunks),
+        "whats_new": parser.whats_new,
+        "signed_out": parser.signed_out,
+    }
+
+
+def signal_hash(indicators, whats_new):
+    # Hash of what we actually track, not of the raw page, so the same listing
+    # hashes the same whether the HTTP or the browser tier fetched it
+    payload = "\n".join(sorted(indicators)) + "\0" + (whats_new or "")
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# --- Tier Stats ---
+
+class TierStats:
+    # With a trace_path, every fetch is also appended as a JSONL line in the
+    # verification trace format, so verification/trace_report.py can report
+    # probe p50/p95 per tier next to the UI checks.
+
+    def __init__(self, trace_path=None):
+        self.tiers = {}
+        self.trace_path = trace_path
+        self.run_id = uuid.uuid4().hex[:12]
+
+    def add(self, tier, outcome, elapsed_ms, package_id=None):
+        stats = self.tiers.setdefault(tier, {"count": 0, "outcomes": {}, "total_ms": 0.0})
+        stats["count"] += 1
+        stats["outcomes"][outcome] = stats["outcomes"].get(outcome, 0) + 1
+        stats["total_ms"] += elapsed_ms
+        if self.trace_path:
+            entry = {
+                "ts": time.time(),
+                "run_id": self.run_id,
+                "script": "beta_probe",
+                "step": f"fetch:{tier}",
+                "duration_ms": round(elapsed_ms, 2),
+                "ok": outcome != "error",
+                "tags": {"outcome": outcome, "package_id": package_id},
+            }
+            with open(self.trace_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def report(self):
+        lines = []
+        for tier, stats in self.tiers.items():
+            avg = stats["total_ms"] / stats["count"]
+            outcomes = ", ".join(f"{k}={v}" for k, v in sorted(stats["outcomes"].items()))
+            lines.append(f"[TIERS] {tier}: {stats['count']} fetches, avg {avg:.0f}ms ({outcomes})")
+
+        static = self.tiers.get("http", {"outcomes": {}})
+        browser = self.tiers.get("browser")
+        decided = static["outcomes"].get("decided", 0)
+        if static.get("count"):
+            lines.append(f"[TIERS] http decided {decided}/{static['count']} "
+                         f"({100 * decided / static['count']:.0f}%) without a browser")
+        if decided and browser:
+            saved = decided * browser["total_ms"] / browser["count"] / 1000
+            lines.append(f"[TIERS] ~{saved:.0f}s of browser time saved")
+        return lines
+
+
+# --- Tiered Fetcher ---
+
+class TieredFetcher:
+    # Tier 1 is a plain GET through the keep-alive pool. Its verdict stands when
+    # the listing is missing (404), when a confident indicator matched, or when
+    # a complete listing showed no indicators at all (unless verify_negatives).
+    # Everything else - throttling, consent walls, truncated pages, weak matches -
+    # is escalated to tier 2, a headless browser with heavy resources blocked.
+
+    def __init__(self, matcher, limiter, tiers=("http", "browser"), storage_state=None,
+                 headless=True, concurrency=4, min_confidence=0.9, verify_negatives=False,
+                 timeout_ms=15000, store_url=STORE_URL, recorder=None, offline=False):
+        # store_url points both tiers somewhere other than the live store (the
+        # replay stand-in), recorder is a HarArchive that keeps every document
+        # fetched, and offline aborts any browser request that leaves store_url.
+        self.matcher = matcher
+        self.limiter = limiter
+        self.tiers = tuple(tiers)
+        self.storage_state = storage_state
+        self.headless = headless
+        self.concurrency = concurrency
+        self.min_confidence = min_confidence
+        self.verify_negatives = verify_negatives
+        self.timeout_ms = timeout_ms
+        self.store_url = store_url
+        self.recorder = recorder
+        self.offline = offline
+        self.stats = TierStats()
+        self.pool = HttpPool(max_idle_per_host=concurrency)
+        self._cookies = _cookie_header(storage_state, store_url)
+        self._playwright = None
+        self._browser = None
+        self._contexts = None
+        self._created = 0
+        self._browser_lock = asyncio.Lock()
+
+    async def fetch(self, package_id):
+        url = self.store_url.format(package_id=package_id)
+        if "http" in self.tiers:
+            record, decided = await self._fetch_http(package_id, url)
+            if decided or "browser" not in self.tiers:
+                if not decided and record.get("status") != "error":
+                    # HTTP-only run and the static page couldn't decide
+                    record["status"] = "undecided"
+                return record
+        return await self._fetch_browser(package_id, url)
+
+    def _verdict(self, record, listing):
+        result = self.matcher.match(listing["text"])
+        record["indicators"] = sorted({m["phrase"] for m in result["matches"]})
+        record["beta_status"] = result["status"]
+        record["confidence"] = result["confidence"]
+        record["whats_new"] = listing["whats_new"]
+        record["content_hash"] = signal_hash(record["indicators"], listing["whats_new"])
+        return record
+
+    def _new_record(self, package_id, tier):
+        # Records always carry the live listing URL, even during replay
+        return {"package_id": package_id, "url": STORE_URL.format(package_id=package_id), "tier": tier}
+
+    async def _fetch_http(self, package_id, url):
+        # Returns (record, decided)
+        record = self._new_record(package_id, "http")
+        started = time.perf_counter()
+        outcome = "escalated"
+        try:
+            await self.limiter.wait(url)
+            headers = {"Cookie": self._cookies} if self._cookies else None
+            status, html = await self.pool.fetch(url, headers)
+            record["http_status"] = status
+            if self.recorder is not None:
+                self.recorder.add(record["url"], status, html, (time.perf_counter() - started) * 1000)
+            if status == 404:
+                outcome = "decided"
+                record.update(status="not_found", indicators=[], beta_status=None,
+                              confidence=0.0, whats_new=None, content_hash=None)
+                return record, True
+            if status != 200:
+                # Throttled or failing: not a verdict. Escalate; an HTTP-only run reports the error.
+                outcome = "error"
+                record.update(status="error", error=f"HTTP {status}")
+                return record, False
+
+            listing = parse_listing(html)
+            self._verdict(record, listing)
+            record["status"] = "ok"
+            record["signed_in"] = not listing["signed_out"]
+            if record["beta_status"]:
+                decided = record["confidence"] >= self.min_confidence
+            else:
+                decided = bool(listing["title"]) and not self.verify_negatives
+            if decided:
+                outcome = "decided"
+            return record, decided
+        except Exception as e:
+            outcome = "error"
+            record["status"] = "error"
+            record["error"] = str(e)
+            return record, False
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            record["elapsed_ms"] = round(elapsed, 1)
+            self.stats.add("http", outcome, elapsed, package_id)
+
+    async def _route(self, route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        elif self.offline and urlsplit(route.request.url).netloc != urlsplit(self.store_url).netloc:
+            await route.abort("internetdisconnected")
+        else:
+            await route.continue_()
+
+    async def _checkout_context(self):
+        async with self._browser_lock:
+            if self._browser is None:
+                # Launched on first escalation so all-static sweeps never start Chromium
+                from playwright.async_api import async_playwright
+                playwright = await async_playwright().start()
+                try:
+                    self._browser = await playwright.chromium.launch(headless=self.headless)
+                except Exception:
+                    # No browser to attach the driver to: stop it, or every later
+                    # escalation would start (and leak) another one
+                    await playwright.stop()
+                    raise
+                self._playwright = playwright
+                self._contexts = asyncio.Queue()
+            if self._contexts.empty() and self._created < self.concurrency:
+                context = await self._browser.new_context(storage_state=self.storage_state)
+                self._created += 1
+                try:
+                    await context.route("**/*", self._route)
+                except Exception:
+                    await self._discard_context(context)
+                    raise
+                return context
+        return await self._contexts.get()
+
+    async def _discard_context(self, context):
+        # Closes a broken context and frees its slot for a fresh one
+        self._created -= 1
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    async def _release_context(self, context, page):
+        if page is not None:
+            try:
+                await page.close()
+                self._contexts.put_nowait(context)
+                return
+            except Exception:
+                pass
+        # The context couldn't open or close a page: don't hand it out again
+        await self._discard_context(context)
+
+    async def _fetch_browser(self, package_id, url):
+        record = self._new_record(package_id, "browser")
+        started = time.perf_counter()
+        page = None
+        context = None
+        try:
+            context = await self._checkout_context()
+            page = await context.new_page()
+            await self.limiter.wait(url)
+            response = await page.goto(url, timeout=self.timeout_ms, wait_until="domcontentloaded")
+            record["http_status"] = response.status if response else None
+            if self.recorder is not None and response is not None:
+                self.recorder.add(record["url"], response.status, await response.text(),
+                                  (time.perf_counter() - started) * 1000)
+            if response is not None and response.status == 404:
+                # Unlisted or region-locked package: nothing to scan
+                record.update(status="not_found", indicators=[], beta_status=None,
+                              confidence=0.0, whats_new=None, content_hash=None)
+            elif response is not None and not 200 <= response.status < 300:
+                # Throttled (429) or failing: the page isn't a listing, so no verdict
+                record.update(status="error", error=f"HTTP {response.status}")
+            else:
+                listing = parse_listing(await page.content())
+                # Match against the rendered text; the static parse only supplies What's New
+                listing["text"] = await page.inner_text("body")
+                self._verdict(record, listing)
+                record["status"] = "ok"
+                record["signed_in"] = not listing["signed_out"]
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+        finally:
+            if context is not None:
+                await self._release_context(context, page)
+        elapsed = (time.perf_counter() - started) * 1000
+        record["elapsed_ms"] = round(elapsed, 1)
+        self.stats.add("browser", record["status"], elapsed, package_id)
+        return record
+
+    async def close(self):
+        self.pool.close()
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+def _cookie_header(storage_state, store_url=STORE_URL):
+    # Session cookies for the HTTP tier, so both tiers see the same account
+    if not storage_state:
+        return None
+    host = urlsplit(store_url).hostname
+    pairs = [
+        f"{cookie['name']}={cookie['value']}"
+        for cookie in storage_state.get("cookies", [])
+        if host == cookie.get("domain", "").lstrip(".")
+        or host.endswith("." + cookie.get("domain", "").lstrip("."))
+    ]
+    return "; ".join(pairs) or None
@@ -0,0 +1,196 @@
+import glob
+import json
+import os
+import re
+from collections import deque
+
+# Indicator dictionaries, one JSON file per locale:
+#   {"locale": "en", "indicators": [{"phrase": ..., "category": ..., "weight": ...}]}
+INDICATORS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "indicators")
+
+# Play Store copy mixes typographic and plain punctuation; fold them together.
+# Every replacement is one character for one character so match offsets still
+# line up with the original text.
+_NORMALIZE = str.maketrans({
+    "\u2019": "'",  # right single quote
+    "\u2018": "'",  # left single quote
+    "\u00a0": " ",  # no-break space
+    "\u202f": " ",  # narrow no-break space
+})
+
+
+def load_dictionary(locales=None, directory=INDICATORS_DIR):
+    # Returns a flat list of indicator entries, each tagged with its locale
+    entries = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        locale = data.get("locale") or os.path.splitext(os.path.basename(path))[0]
+        if locales and locale not in locales:
+            continue
+        for item in data.get("indicators", []):
+            entries.append({
+                "phrase": item["phrase"],
+                "category": item.get("category", "open"),
+                "weight": float(item.get("weight", 1.0)),
+                "locale": locale,
+            })
+    return entries
+
+
+def _key(phrase):
+    return phrase.translate(_NORMALIZE).lower()
+
+
+def _lower_aligned(text):
+    # str.lower() can lengthen a few characters (e.g. 'İ'); keep offsets stable
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+def _is_word_char(text, i):
+    return 0 <= i < len(text) and (text[i].isalnum() or text[i] == "_")
+
+
+class _Matcher:
+    def __init__(self, entries):
+        # Several locales may share a phrase; keep every entry behind one key
+        self.entries = {}
+        for entry in entries:
+            self.entries.setdefault(_key(entry["phrase"]), []).append(entry)
+
+    def _spans(self, text):
+        raise NotImplementedError
+
+    def match(self, text):
+        text = text.translate(_NORMALIZE)
+        matches = []
+        for start, end, key in self._spans(text):
+            for entry in self.entries[key]:
+                matches.append({
+                    "phrase": entry["phrase"],
+                    "locale": entry["locale"],
+                    "category": entry["category"],
+                    "weight": entry["weight"],
+                    "start": start,
+                    "end": end,
+                })
+        return score(matches)
+
+
+class RegexMatcher(_Matcher):
+    # All phrases folded into one prefix-factored regex, so the regex engine
+    # walks a trie instead of trying every alternative at every position.
+
+    def __init__(self, entries):
+        super().__init__(entries)
+        trie = {}
+        for key in self.entries:
+            node = trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[""] = True
+        body = self._trie_pattern(trie) if self.entries else "(?!)"
+        self.pattern = re.compile(r"(?<!\w)(" + body + r")(?!\w)", re.IGNORECASE)
+
+    def _trie_pattern(self, node):
+        alternatives = [re.escape(ch) + self._trie_pattern(child)
+                        for ch, child in sorted(node.items()) if ch != ""]
+        if not alternatives:
+            return ""
+        optional = "" in node
+        if len(alternatives) == 1 and not optional:
+            return alternatives[0]
+        group = "(?:" + "|".join(alternatives) + ")"
+        return group + "?" if optional else group
+
+    def _spans(self, text):
+        for m in self.pattern.finditer(text):
+            yield m.start(1), m.end(1), _key(m.group(1))
+
+
+class AhoCorasickMatcher(_Matcher):
+    # Classic automaton: one pass over the text regardless of dictionary size,
+    # and it reports overlapping phrases ("Join the beta" inside
+    # "Join the beta program") which the regex engine collapses.
+
+    def __init__(self, entries):
+        super().__init__(entries)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for key in self.entries:
+            state = 0
+            for ch in key:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state].append(key)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _spans(self, text):
+        lowered = _lower_aligned(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for key in out[state]:
+                start, end = i + 1 - len(key), i + 1
+                if not _is_word_char(text, start - 1) and not _is_word_char(text, end):
+                    yield start, end, key
+
+
+ENGINES = {
+    "regex": RegexMatcher,
+    "aho": AhoCorasickMatcher,
+}
+
+
+def build_matcher(entries=None, engine="regex"):
+    if entries is None:
+        entries = load_dictionary()
+    try:
+        return ENGINES[engine](entries)
+    except KeyError:
+        raise ValueError(f"Unknown matcher engine '{engine}' (expected one of {sorted(ENGINES)})") from None
+
+
+def score(matches):
+    # Each distinct phrase is independent evidence for its category:
+    # confidence = 1 - prod(1 - weight). Repeats of one phrase count once.
+    seen = {}
+    for m in matches:
+        key = (m["category"], _key(m["phrase"]))
+        seen[key] = max(seen.get(key, 0.0), m["weight"])
+
+    categories = {}
+    for (category, _), weight in seen.items():
+        miss = 1.0 - categories.get(category, 0.0)
+        categories[category] = 1.0 - miss * (1.0 - min(max(weight, 0.0), 1.0))
+
+    status = max(categories, key=categories.get) if categories else None
+    return {
+        "status": status,
+        "confidence": round(categories[status], 3) if status else 0.0,
+        "categories": {k: round(v, 3) for k, v in categories.items()},
+        "matches": sorted(matches, key=lambda m: m["start"]),
+    }
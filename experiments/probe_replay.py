@@ -0,0 +1,162 @@
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Record/replay for offline, deterministic probe runs. A recording keeps the
+# document responses of a live sweep in a HAR 1.2 file; replay serves them from
+# a local stand-in server that both fetch tiers are pointed at, with the
+# network latency chosen by the caller.
+
+
+def _key(url):
+    # Host-independent, so a live recording replays from 127.0.0.1
+    parts = urlsplit(url)
+    return parts.path + ("?" + parts.query if parts.query else "")
+
+
+class HarArchive:
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+
+    @classmethod
+    def load(cls, path):
+        archive = cls(path)
+        with open(path, encoding="utf-8") as f:
+            har = json.load(f)
+        for entry in har["log"]["entries"]:
+            archive.entries[_key(entry["request"]["url"])] = entry
+        return archive
+
+    def add(self, url, status, body, elapsed_ms, mime_type="text/html; charset=utf-8"):
+        # Only what replay needs: no request headers, so no cookies end up on disk
+        self.entries[_key(url)] = {
+            "startedDateTime": datetime.now(timezone.utc).isoformat(),
+            "time": round(elapsed_ms, 1),
+            "request": {
+                "method": "GET",
+                "url": url,
+                "httpVersion": "HTTP/1.1",
+                "headers": [],
+                "queryString": [],
+                "cookies": [],
+                "headersSize": -1,
+                "bodySize": 0,
+            },
+            "response": {
+                "status": status,
+                "statusText": "",
+                "httpVersion": "HTTP/1.1",
+                "headers": [{"name": "Content-Type", "value": mime_type}],
+                "cookies": [],
+                "content": {"size": len(body), "mimeType": mime_type, "text": body},
+                "redirectURL": "",
+                "headersSize": -1,
+                "bodySize": -1,
+            },
+            "cache": {},
+            "timings": {"send": 0, "wait": round(elapsed_ms, 1), "receive": 0},
+        }
+
+    def lookup(self, url):
+        return self.entries.get(_key(url))
+
+    def save(self):
+        har = {
+            "log": {
+                "version": "1.2",
+                "creator": {"name": "beta_probe", "version": "1"},
+                "entries": list(self.entries.values()),
+            }
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(har, f)
+
+
+def parse_latency(spec):
+    # "0" / "250" -> fixed ms, "100-800" -> uniform range, "recorded" -> the
+    # timing captured in the HAR. Returns a function(entry, rng) -> seconds.
+    spec = (spec or "0").strip().lower()
+    if spec == "recorded":
+        return lambda entry, rng: (entry["time"] if entry else 0) / 1000
+    if "-" in spec:
+        low, high = (float(part) for part in spec.split("-", 1))
+        return lambda entry, rng: rng.uniform(low, high) / 1000
+    fixed = float(spec) / 1000
+    return lambda entry, rng: fixed
+
+
+class ReplayServer:
+    # Local stand-in for play.google.com. Unknown URLs get a 404, which the
+    # probe already treats as "listing not found".
+
+    def __init__(self, archive, latency="0", seed=0, host="127.0.0.1", port=0):
+        self.archive = archive
+        self.delay = parse_latency(latency)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                entry = server.archive.lookup(self.path)
+                with server._rng_lock:
+                    delay = server.delay(entry, server._rng)
+                    if entry:
+                        server.hits += 1
+                    else:
+                        server.misses += 1
+                if delay > 0:
+                    time.sleep(delay)
+
+                if entry is None:
+                    status, mime_type, body = 404, "text/plain", b"not recorded"
+                else:
+                    content = entry["response"]["content"]
+                    status = entry["response"]["status"]
+                    mime_type = content.get("mimeType", "text/html; charset=utf-8")
+                    body = content.get("text", "").encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", mime_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def store_url(self, template):
+        # Rewrites a live URL template onto the stand-in, keeping path and query
+        return self.base_url + _key(template)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
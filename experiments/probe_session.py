@@ -0,0 +1,57 @@
+import json
+import os
+import time
+
+# Where the logged-in browser state is kept between runs. This file holds live
+# Google cookies, so it is git-ignored and written with owner-only permissions.
+SESSION_PATH = "experiments/.probe_session.json"
+
+# Google keeps web sessions alive for weeks, but we re-check well before that
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Cookies that only exist while a Google account is signed in
+AUTH_COOKIES = ("SID", "__Secure-1PSID", "__Secure-3PSID")
+
+# The Play Store only renders a "Sign in" link for anonymous visitors
+SIGNED_OUT_SELECTOR = "a[href*='accounts.google.com/ServiceLogin']"
+
+
+def load_session(path=SESSION_PATH):
+    # Returns the cached storage_state, or None if it is missing, expired or
+    # no longer carries a usable auth cookie. Does not touch the network.
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    now = time.time()
+    if cached.get("expires_at", 0) <= now:
+        return None
+
+    state = cached.get("storage_state") or {}
+    for cookie in state.get("cookies", []):
+        if cookie.get("name") in AUTH_COOKIES:
+            # Session cookies report expires == -1
+            if cookie.get("expires", -1) == -1 or cookie["expires"] > now:
+                return state
+    return None
+
+
+def save_session(state, path=SESSION_PATH, ttl=DEFAULT_TTL):
+    now = time.time()
+    payload = {"saved_at": now, "expires_at": now + ttl, "storage_state": state}
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+
+
+def invalidate_session(path=SESSION_PATH):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def is_signed_in(page):
+    return page.locator(SIGNED_OUT_SELECTOR).count() == 0
@@ -0,0 +1,172 @@
+import json
+import sqlite3
+import time
+
+STORE_PATH = "experiments/probe_results.db"
+
+# How long a successful scan is trusted before the package is revisited
+DEFAULT_TTL = 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS probe_results (
+    package_id        TEXT PRIMARY KEY,
+    beta_status       TEXT,
+    confidence        REAL NOT NULL DEFAULT 0,
+    indicators        TEXT NOT NULL DEFAULT '[]',
+    content_hash      TEXT,
+    fetched_at        REAL NOT NULL DEFAULT 0,
+    ttl               REAL NOT NULL,
+    status_changed_at REAL,
+    last_error        TEXT
+);
+CREATE TABLE IF NOT EXISTS probe_history (
+    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+    package_id        TEXT NOT NULL,
+    previous_status   TEXT,
+    beta_status       TEXT,
+    content_hash      TEXT,
+    changed_at        REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_changed_at ON probe_history (changed_at);
+CREATE TABLE IF NOT EXISTS probe_schedule (
+    package_id        TEXT PRIMARY KEY,
+    next_check_at     REAL NOT NULL,
+    interval          REAL NOT NULL,
+    failures          INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class ProbeStore:
+    # One row per package (the latest verdict) plus an append-only history of
+    # status/content changes, so "what changed since T" is a local query.
+
+    def __init__(self, path=STORE_PATH, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, package_id):
+        row = self.conn.execute(
+            "SELECT * FROM probe_results WHERE package_id = ?", (package_id,)
+        ).fetchone()
+        return _row_to_dict(row) if row else None
+
+    def due(self, package_ids, now=None):
+        # Package IDs that were never scanned, failed last time, or outlived their TTL
+        now = time.time() if now is None else now
+        fresh = {
+            row["package_id"]
+            for row in self.conn.execute(
+                "SELECT package_id FROM probe_results "
+                "WHERE last_error IS NULL AND fetched_at + ttl > ?", (now,)
+            )
+        }
+        return [package_id for package_id in package_ids if package_id not in fresh]
+
+    def save(self, record, now=None):
+        # Upserts one probe record. Returns True when the package's beta status
+        # or content hash differs from what was stored before.
+        now = time.time() if now is None else now
+        package_id = record["package_id"]
+        previous = self.get(package_id)
+
+        with self.conn:
+            if record.get("status") in ("error", "undecided"):
+                # Not a verdict: keep the last good one; the error makes the row due again
+                error = record.get("error") or (
+                    "undecided" if record.get("status") == "undecided" else "unknown error")
+                if previous is None:
+                    self.conn.execute(
+                        "INSERT INTO probe_results (package_id, ttl, last_error) VALUES (?, ?, ?)",
+                        (package_id, self.ttl, error),
+                    )
+                else:
+                    self.conn.execute(
+                        "UPDATE probe_results SET last_error = ? WHERE package_id = ?",
+                        (error, package_id),
+                    )
+                return False
+
+            status = record.get("beta_status")
+            content_hash = record.get("content_hash")
+            changed = (
+                previous is None
+                or previous["fetched_at"] == 0
+                or previous["beta_status"] != status
+                or previous["content_hash"] != content_hash
+            )
+            status_changed_at = now if changed else previous["status_changed_at"]
+
+            self.conn.execute(
+                "INSERT OR REPLACE INTO probe_results "
+                "(package_id, beta_status, confidence, indicators, content_hash, "
+                " fetched_at, ttl, status_changed_at, last_error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+                (
+                    package_id,
+                    status,
+                    record.get("confidence", 0.0),
+                    json.dumps(record.get("indicators", [])),
+                    content_hash,
+                    now,
+                    self.ttl,
+                    status_changed_at,
+                ),
+            )
+            if changed:
+                self.conn.execute(
+                    "INSERT INTO probe_history "
+                    "(package_id, previous_status, beta_status, content_hash, changed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (package_id, previous["beta_status"] if previous else None,
+                     status, content_hash, now),
+                )
+        return changed
+
+    def changed_since(self, since, status_only=False):
+        # Latest row for every package whose status (or, unless status_only,
+        # content) changed at or after `since`. Never touches the network.
+        query = (
+            "SELECT r.*, h.previous_status, MAX(h.changed_at) AS changed_at FROM probe_results r "
+            "JOIN probe_history h ON h.package_id = r.package_id "
+            "WHERE h.changed_at >= ?"
+        )
+        if status_only:
+            query += " AND h.previous_status IS NOT h.beta_status"
+        # SQLite takes bare columns from the row holding MAX(), i.e. the latest change
+        query += " GROUP BY r.package_id ORDER BY changed_at"
+        return [_row_to_dict(row) for row in self.conn.execute(query, (since,))]
+
+
+    def schedule(self):
+        # Watch-mode scheduler state per package, so a restarted daemon resumes
+        # its adaptive intervals and backoff instead of rechecking everything
+        return {
+            row["package_id"]: dict(row)
+            for row in self.conn.execute("SELECT * FROM probe_schedule")
+        }
+
+    def save_schedule(self, package_id, next_check_at, interval, failures):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO probe_schedule "
+                "(package_id, next_check_at, interval, failures) VALUES (?, ?, ?, ?)",
+                (package_id, next_check_at, interval, failures),
+            )
+
+
+def _row_to_dict(row):
+    data = dict(row)
+    data["indicators"] = json.loads(data.get("indicators") or "[]")
+    return data
@@ -1,6 +1,6 @@
 import { initializeApp } from "firebase/app";
-import { getAuth, GoogleAuthProvider } from "firebase/auth";
-import { getFirestore } from "firebase/firestore";
+import { getAuth, GoogleAuthProvider, connectAuthEmulator } from "firebase/auth";
+import { getFirestore, connectFirestoreEmulator } from "firebase/firestore";
 
 const firebaseConfig = {
   apiKey: import.meta.env.VITE_FIREBASE_API_KEY,
@@ -22,4 +22,18 @@ export const googleProvider = new GoogleAuthProvider();
 // Demo mode flag
 export const isDemoMode = import.meta.env.VITE_DEMO_MODE === 'true';
 
+// Local emulators instead of the live project (load tests, offline dev)
+export const usesEmulators = import.meta.env.VITE_USE_EMULATORS === 'true';
+if (usesEmulators) {
+  const authHost = import.meta.env.VITE_AUTH_EMULATOR_HOST || '127.0.0.1:9099';
+  const [firestoreHost, firestorePort] = (import.meta.env.VITE_FIRESTORE_EMULATOR_HOST || '127.0.0.1:8080').split(':');
+  connectAuthEmulator(auth, `http://${authHost}`, { disableWarnings: true });
+  connectFirestoreEmulator(db, firestoreHost, Number(firestorePort));
+}
+
+// Lets test tooling confirm it isn't about to talk to production
+if (usesEmulators || isDemoMode) {
+  window.__BETAMAX_BACKEND__ = usesEmulators ? 'emulators' : 'demo';
+}
+
 export default app;
@@ -0,0 +1,318 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from playwright.sync_api import sync_playwright
+
+from auth_fixtures import TARGETS, logged_in_page
+from shared_browser import launch_browser
+
+# Whole-app accessibility audit. verify_a11y.py spot-checks two buttons with a
+# round trip per attribute; this navigates every authenticated route in-page
+# and pulls every interactive element's role, name and aria state back in one
+# evaluate() per route, then runs the rules here. Routes whose DOM hash hasn't
+# changed since the last run reuse their cached findings.
+
+REPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "test_reports", "a11y")
+CACHE_PATH = os.path.join(REPORT_DIR, "cache.json")
+
+# Bump when rules or collected fields change so cached findings are redone
+RULES_VERSION = 1
+
+# Authenticated routes per app. frontend/ adds a mission detail route from the
+# dashboard's project cards; the portal (PrototypeApp) runs on mock data, so its
+# project detail route is fixed.
+ROUTES = {
+    "frontend": ["/", "/missions", "/external", "/terminal", "/arcade", "/report"],
+    "portal": ["/", "/project/p1", "/feedback/new", "/profile"],
+}
+
+# An element only that route renders, so the audit knows the route has mounted.
+# Keys ending in "/" cover every route under them. The portal has no test ids.
+ROUTE_MARKERS = {
+    "frontend": {
+        "/": "[data-testid='report-anomaly-btn']",
+        "/missions": "[data-testid='mission-search']",
+        "/external": "[data-testid='add-external-beta-btn']",
+        "/terminal": "[data-testid='terminal-container']",
+        "/arcade": "[data-testid='start-game-btn']",
+        "/report": "[data-testid='anomaly-report-form']",
+        "/mission/": "[data-testid='submit-anomaly-btn']",
+    },
+    "portal": {
+        "/": "button[aria-label='Go to profile']",
+        "/project/": "button[aria-label='Go back']",
+        "/feedback/new": "#title-input",
+        "/profile": "img[alt='User']",
+    },
+}
+
+
+def route_marker(target, path):
+    markers = ROUTE_MARKERS[target]
+    return markers.get(path) or markers[path[:path.index("/", 1) + 1]]
+
+
+# Navigates client-side (both apps use HashRouter), waits for the route's
+# marker and for the DOM to go quiet, hashes it and, unless the hash matches
+# the cached one, collects every interactive element
+AUDIT_JS = """
+async ([path, marker, knownHash]) => {
+  const route = () => location.hash.replace(/^#/, '') || '/';
+  if (route() !== path) location.hash = '#' + path;
+  await new Promise((resolve) => {
+    const started = performance.now();
+    const poll = () => (document.querySelector(marker) || performance.now() - started > 5000
+      ? resolve() : requestAnimationFrame(poll));
+    poll();
+  });
+  if (!document.querySelector(marker)) return { path: route(), missing: true };
+  // Settled = no DOM mutations for 300ms (capped at 5s)
+  await new Promise((resolve) => {
+    let timer = setTimeout(done, 300);
+    const cap = setTimeout(done, 5000);
+    const observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(done, 300); });
+    observer.observe(document.body, { childList: true, subtree: true, attributes: true, characterData: true });
+    function done() { observer.disconnect(); clearTimeout(timer); clearTimeout(cap); resolve(); }
+  });
+
+  // FNV-1a over the markup minus inline styles (animations rewrite those)
+  const markup = document.body.innerHTML.replace(/ style="[^"]*"/g, '');
+  let h = 0x811c9dc5;
+  for (let i = 0; i < markup.length; i++) { h ^= markup.charCodeAt(i); h = Math.imul(h, 0x01000193); }
+  const hash = (h >>> 0).toString(16) + ':' + markup.length;
+  if (hash === knownHash) return { hash, cached: true, path: route() };
+
+  const IMPLICIT = { A: 'link', BUTTON: 'button', SELECT: 'combobox', TEXTAREA: 'textbox', IMG: 'img' };
+  const INPUT_ROLES = { checkbox: 'checkbox', radio: 'radio', range: 'slider', submit: 'button', button: 'button' };
+  const text = (el) => (el ? el.textContent.replace(/\\s+/g, ' ').trim() : '');
+  const byIds = (ids) => ids.split(/\\s+/).map((id) => text(document.getElementById(id))).join(' ').trim();
+
+  const accessibleName = (el) => {
+    if (el.getAttribute('aria-labelledby')) return [byIds(el.getAttribute('aria-labelledby')), 'aria-labelledby'];
+    if (el.getAttribute('aria-label')) return [el.getAttribute('aria-label').trim(), 'aria-label'];
+    if (el.labels && el.labels.length) return [text(el.labels[0]), 'label'];
+    if (el.tagName === 'IMG') return [el.getAttribute('alt') || '', 'alt'];
+    if (!['INPUT', 'SELECT', 'TEXTAREA'].includes(el.tagName) && text(el)) return [text(el), 'content'];
+    if (el.getAttribute('title')) return [el.getAttribute('title').trim(), 'title'];
+    if (el.getAttribute('placeholder')) return [el.getAttribute('placeholder').trim(), 'placeholder'];
+    return ['', null];
+  };
+
+  const semantic = 'a[href], button, input, select, textarea, img, [role], [tabindex], summary';
+  const candidates = new Set(document.body.querySelectorAll(semantic));
+  // Clickable containers (onClick on a div) only show up as cursor: pointer
+  for (const el of document.body.querySelectorAll('div, span, li, section, article, svg')) {
+    if (getComputedStyle(el).cursor === 'pointer' &&
+        (!el.parentElement || getComputedStyle(el.parentElement).cursor !== 'pointer')) {
+      candidates.add(el);
+    }
+  }
+
+  const elements = [];
+  for (const el of candidates) {
+    if (el.closest('svg') && el.tagName.toLowerCase() !== 'svg') continue;
+    const rect = el.getBoundingClientRect();
+    if (!rect.width && !rect.height) continue;
+    const [name, nameSource] = accessibleName(el);
+    const aria = {};
+    for (const attr of el.attributes) if (attr.name.startsWith('aria-')) aria[attr.name] = attr.value;
+    const tag = el.tagName.toLowerCase();
+    const type = el.getAttribute('type');
+    const testid = el.getAttribute('data-testid') || (el.closest('[data-testid]') || {}).dataset?.testid || null;
+    elements.push({
+      tag,
+      type,
+      role: el.getAttribute('role') || (tag === 'input' ? INPUT_ROLES[type] || 'textbox' : IMPLICIT[el.tagName] || null),
+      explicit_role: el.hasAttribute('role'),
+      name: name.slice(0, 120),
+      name_source: nameSource,
+      aria,
+      testid,
+      own_testid: el.hasAttribute('data-testid'),
+      has_alt: el.hasAttribute('alt'),
+      tabindex: el.hasAttribute('tabindex') ? Number(el.getAttribute('tabindex')) : null,
+      disabled: el.disabled === true,
+      icon_only: !text(el) && !!el.querySelector('svg'),
+      clickable: getComputedStyle(el).cursor === 'pointer',
+      aria_hidden_ancestor: !!el.closest('[aria-hidden="true"]'),
+      focusable: el.tabIndex >= 0 && !el.disabled,
+      html: el.outerHTML.slice(0, 160),
+    });
+  }
+  const cards = [...document.querySelectorAll("[data-testid^='project-card-']")]
+    .map((el) => el.dataset.testid.slice('project-card-'.length));
+  return { hash, cached: false, path: route(), elements, cards };
+}
+"""
+
+NATIVE_INTERACTIVE = {"a", "button", "input", "select", "textarea", "summary"}
+WIDGET_ROLES = {"button", "link", "checkbox", "radio", "switch", "tab", "menuitem", "option",
+                "combobox", "textbox", "slider", "searchbox"}
+TRISTATE = {"true", "false", "mixed"}
+BOOLEAN = {"true", "false"}
+
+
+def _locate(element):
+    if element["own_testid"]:
+        return f"[data-testid='{element['testid']}']"
+    within = f" in [data-testid='{element['testid']}']" if element["testid"] else ""
+    return f"{element['html'][:80]}{within}"
+
+
+def check_element(element):
+    # (severity, rule, message) for one collected element
+    findings = []
+    role = element["role"]
+    tag = element["tag"]
+
+    if role in ("button", "link") and not element["name"]:
+        hint = " (icon-only, needs aria-label)" if element["icon_only"] else ""
+        findings.append(("error", f"{role}-name", f"{role} has no accessible name{hint}"))
+    if role in ("textbox", "combobox", "checkbox", "radio", "slider", "searchbox"):
+        if not element["name"]:
+            findings.append(("error", "form-label", "form control has no label"))
+        elif element["name_source"] == "placeholder":
+            findings.append(("warning", "label-placeholder-only", "form control is labelled only by its placeholder"))
+    if tag == "img" and not element["has_alt"]:
+        findings.append(("error", "image-alt", "img has no alt attribute"))
+    if (element["clickable"] and tag not in NATIVE_INTERACTIVE
+            and role not in WIDGET_ROLES and element["tabindex"] is None):
+        findings.append(("error", "clickable-no-role",
+                         "clickable element has no role and is not keyboard focusable"))
+    if element["explicit_role"] and role in WIDGET_ROLES and tag not in NATIVE_INTERACTIVE \
+            and element["tabindex"] is None:
+        findings.append(("error", "role-not-focusable", f"role={role} but not keyboard focusable"))
+    if element["tabindex"] is not None and element["tabindex"] > 0:
+        findings.append(("warning", "positive-tabindex", f"tabindex={element['tabindex']} overrides tab order"))
+    if element["aria_hidden_ancestor"] and element["focusable"]:
+        findings.append(("error", "aria-hidden-focus", "focusable element inside aria-hidden"))
+    for attr, allowed in (("aria-pressed", TRISTATE), ("aria-checked", TRISTATE),
+                          ("aria-expanded", BOOLEAN), ("aria-selected", BOOLEAN)):
+        value = element["aria"].get(attr)
+        if value is not None and value not in allowed:
+            findings.append(("error", "aria-value", f'{attr}="{value}" is not a valid value'))
+    return findings
+
+
+def run_rules(elements):
+    findings = []
+    for element in elements:
+        for severity, rule, message in check_element(element):
+            findings.append({"severity": severity, "rule": rule, "message": message, "at": _locate(element)})
+    return findings
+
+
+def load_cache():
+    try:
+        with open(CACHE_PATH, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache["routes"] if cache.get("rules_version") == RULES_VERSION else {}
+
+
+def save_cache(routes):
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    with open(CACHE_PATH, "w", encoding="utf-8") as f:
+        json.dump({"rules_version": RULES_VERSION, "routes": routes}, f)
+
+
+def audit_target(browser, target, cache, use_cache=True):
+    page = logged_in_page(browser, target)
+    results = {}
+    queue = list(ROUTES[target])
+    seen = set()
+    while queue:
+        path = queue.pop(0)
+        if path in seen:
+            continue
+        seen.add(path)
+        key = f"{target} {path}"
+        cached = cache.get(key) if use_cache else None
+
+        started = time.perf_counter()
+        snapshot = page.evaluate(AUDIT_JS, [path, route_marker(target, path), cached["hash"] if cached else None])
+        elapsed = (time.perf_counter() - started) * 1000
+        if snapshot["path"] != path:
+            print(f"⚠️ {key}: redirected to {snapshot['path']}, skipped")
+            continue
+        if snapshot.get("missing"):
+            print(f"⚠️ {key}: {route_marker(target, path)} never rendered, skipped")
+            continue
+
+        if snapshot["cached"]:
+            result = dict(cached, cached=True)
+        else:
+            result = {
+                "hash": snapshot["hash"],
+                "elements": len(snapshot["elements"]),
+                "findings": run_rules(snapshot["elements"]),
+                "cards": snapshot["cards"],
+            }
+            cache[key] = result
+            result = dict(result, cached=False)
+        result["ms"] = round(elapsed)
+        results[key] = result
+
+        # One mission detail page is representative of all of them
+        if path == "/" and result.get("cards"):
+            queue.append(f"/mission/{result['cards'][0]}")
+    page.context.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit every authenticated route for accessibility issues.")
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=sorted(TARGETS),
+                        help="apps to audit (default: all)")
+    parser.add_argument("--no-cache", action="store_true", help="re-audit routes even if their DOM is unchanged")
+    parser.add_argument("--warnings", action="store_true", help="fail on warnings too")
+    args = parser.parse_args(argv)
+
+    cache = load_cache()
+    started = time.perf_counter()
+    results = {}
+    unaudited = []
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+        try:
+            for target in args.targets:
+                audited = audit_target(browser, target, cache, not args.no_cache)
+                if not audited:
+                    unaudited.append(target)
+                results.update(audited)
+        finally:
+            browser.close()
+    elapsed = time.perf_counter() - started
+    save_cache(cache)
+
+    failing = 0
+    for key, result in results.items():
+        errors = [f for f in result["findings"] if f["severity"] == "error"]
+        warnings = [f for f in result["findings"] if f["severity"] == "warning"]
+        bad = errors + (warnings if args.warnings else [])
+        failing += len(bad)
+        note = " (unchanged, cached)" if result["cached"] else ""
+        icon = "❌" if bad else ("⚠️" if warnings else "✅")
+        print(f"{icon} {key}: {result['elements']} elements, {len(errors)} errors, "
+              f"{len(warnings)} warnings, {result['ms']}ms{note}")
+        for finding in result["findings"]:
+            print(f"    [{finding['severity']}] {finding['rule']}: {finding['message']} -> {finding['at']}")
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    output = os.path.join(REPORT_DIR, f"audit-{int(time.time())}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"elapsed_s": round(elapsed, 1), "routes": results}, f, indent=2)
+    print(f"\nAudited {len(results)} routes in {elapsed:.1f}s, report saved to {output}")
+    # A target with no route audited means the route tables no longer match the app
+    for target in unaudited:
+        print(f"❌ {target}: no route could be audited")
+    return 1 if failing or unaudited else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import json
+import os
+import time
+
+# Logged-in browser state, cached per app target and demo account so only the
+# checks that exercise the auth flow pay for a UI login. Targets that keep the
+# session in memory only ("persistent": False) can't be cached and always log in.
+AUTH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".auth")
+AUTH_TTL = 12 * 3600
+
+TARGETS = {
+    # betamax-portal/ dev server; the user lives in React state only, so
+    # nothing survives a page load and there is no state worth caching
+    "portal": {
+        "persistent": False,
+        "url": "http://localhost:5173/",
+        "email": "#auth-email",
+        "password": "#auth-password",
+        "submit": "button:has-text('Sign In')",
+        "login_ready": "#auth-email",
+        "ready": "text=Dashboard",
+        "accounts": {"alex@test.com": "password"},
+        "timeout": 5000,
+    },
+    # frontend/ dev server; the preloader can hold the login form back ~10s
+    "frontend": {
+        "persistent": True,
+        "url": "http://localhost:3000/",
+        "email": "[data-testid='email-input']",
+        "password": "[data-testid='password-input']",
+        "submit": "[data-testid='login-submit-btn']",
+        "login_ready": "[data-testid='email-input']",
+        "ready": "text=THE_DECK",
+        "accounts": {"neo@betamax.io": "test1234", "sarah@betamax.io": "test1234"},
+        "timeout": 15000,
+    },
+}
+
+
+def state_path(target, email):
+    return os.path.join(AUTH_DIR, f"{target}-{email.replace('@', '_at_')}.json")
+
+
+def load_state(target, email):
+    path = state_path(target, email)
+    try:
+        if time.time() - os.path.getmtime(path) > AUTH_TTL:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_state(context, target, email):
+    os.makedirs(AUTH_DIR, exist_ok=True)
+    try:
+        # Firebase keeps its session in IndexedDB, which needs Playwright 1.51+
+        state = context.storage_state(indexed_db=True)
+    except TypeError:
+        state = context.storage_state()
+    # Checks run in parallel; write-then-rename so nobody reads half a file
+    path = state_path(target, email)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def ui_login(page, target, email=None):
+    config = TARGETS[target]
+    email = email or next(iter(config["accounts"]))
+    page.wait_for_selector(config["login_ready"], timeout=config["timeout"])
+    page.fill(config["email"], email)
+    page.fill(config["password"], config["accounts"][email])
+    page.click(config["submit"])
+    page.wait_for_selector(config["ready"], timeout=config["timeout"])
+
+
+def logged_in_page(browser, target, email=None, tracer=None):
+    # Returns a page on the target app, already past the login screen. Reuses the
+    # cached state when it still works and falls back to one UI login otherwise.
+    # With a tracer, the page comes back wrapped and the login is a traced step.
+    config = TARGETS[target]
+    email = email or next(iter(config["accounts"]))
+    state = load_state(target, email) if config["persistent"] else None
+
+    context = browser.new_context(storage_state=state) if state else browser.new_context()
+    page = context.new_page()
+    if tracer is not None:
+        page = tracer.wrap(page)
+
+    started = time.perf_counter()
+    page.goto(config["url"])
+    if state:
+        # Whichever shows up first: the app (cache valid) or the login form (stale)
+        app = page.locator(config["ready"])
+        app.or_(page.locator(config["login_ready"])).first.wait_for(timeout=config["timeout"])
+        if app.first.is_visible():
+            if tracer is not None:
+                tracer.record("login (cached)", (time.perf_counter() - started) * 1000, target=target)
+            return page
+        print(f"Cached login for {email} on {target} is stale, logging in again...")
+
+    try:
+        ui_login(page, target, email)
+    except Exception:
+        page.screenshot(path="verification/debug_login_error.png")
+        raise
+    if config["persistent"]:
+        save_state(context, target, email)
+    if tracer is not None:
+        tracer.record("login (ui)", (time.perf_counter() - started) * 1000, target=target)
+    return page
@@ -0,0 +1,232 @@
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from trace_report import percentile
+
+# The compiler and the Firestore REST codec live in experiments/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "experiments"))
+from bmql import APP_QUERIES, INDEXES_PATH, BMQLError, IndexAdvisor, Plan, PlanCache, canonicalize, parse  # noqa: E402
+from firestore_rest import FIRESTORE_HOST, OWNER_TOKEN, default_project, from_document, to_value  # noqa: E402
+
+# Benchmarks BMQL against the Firestore emulator: what compiling costs with and
+# without the plan cache, and per query the latency, how many documents the
+# server sent vs how many survived client-side filtering, and whether the plan
+# is covered by firestore.indexes.json. The emulator does not enforce
+# composite indexes, so a "missing" query still runs here but would fail with
+# FAILED_PRECONDITION in production.
+#
+#   firebase emulators:start --only firestore
+#   python verification/bench_bmql.py --missions 50 --anomalies 2000 --runs 30
+
+SEED_PREFIX = "bmql-bench"
+SEVERITIES = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+TITLES = ("App crash on launch", "Login button unresponsive", "Crash when rotating screen",
+          "Typo in settings", "Battery drain overnight", "Sync stalls on slow network")
+COMMIT_BATCH = 400
+
+# Extra workload on top of APP_QUERIES: the same shapes with other literals,
+# the way Query Core traffic repeats, so the cache's shape hits show up
+WORKLOAD_VARIANTS = [
+    'FIND anomalies WHERE severity = "HIGH" AND missionName = "Titan OS" AND title ~ "crash"',
+    'FIND anomalies WHERE severity = "LOW" AND missionName = "Nova Launcher" AND title ~ "login"',
+    'FIND missions WHERE status = "CLOSED"',
+    'FIND missions WHERE type = "INTERNAL" ORDER BY createdAt DESC',
+    'FIND anomalies WHERE severity IN ("HIGH", "CRITICAL") AND status = "OPEN"',
+    'FIND anomalies WHERE missionId = $mission AND title ~ "crash" LIMIT 10',
+]
+
+
+class Emulator:
+    # One keep-alive connection; the benchmark runs queries sequentially
+
+    def __init__(self, hostport, project):
+        self.hostport = hostport
+        self.base = f"/v1/projects/{project}/databases/(default)/documents"
+        self.conn = http.client.HTTPConnection(hostport, timeout=30)
+
+    def post(self, path, body):
+        payload = json.dumps(body)
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {OWNER_TOKEN}"}
+        try:
+            self.conn.request("POST", self.base + path, payload, headers)
+            response = self.conn.getresponse()
+        except (http.client.HTTPException, ConnectionError):
+            # Dropped keep-alive connection: reconnect once
+            self.conn.close()
+            self.conn.request("POST", self.base + path, payload, headers)
+            response = self.conn.getresponse()
+        data = response.read().decode("utf-8", errors="replace")
+        if response.status >= 400:
+            raise RuntimeError(f"HTTP {response.status}: {data[:200]}")
+        return json.loads(data)
+
+    def run_query(self, structured_query):
+        results = self.post(":runQuery", {"structuredQuery": structured_query})
+        return [from_document(r["document"]) for r in results if "document" in r]
+
+    def commit(self, writes):
+        for start in range(0, len(writes), COMMIT_BATCH):
+            self.post(":commit", {"writes": writes[start:start + COMMIT_BATCH]})
+
+    def close(self):
+        self.conn.close()
+
+
+def seed(emulator, project, missions, anomalies, rng):
+    # Deterministic document IDs, so re-seeding overwrites instead of piling up
+    root = f"projects/{project}/databases/(default)/documents"
+    now = datetime.now(timezone.utc)
+    architects = [f"{SEED_PREFIX}-architect-{i}" for i in range(max(1, missions // 10))]
+    names = ["Titan OS", "Nova Launcher"] + [f"Mission {i}" for i in range(2, missions)]
+    writes = []
+    mission_docs = []
+    for i in range(missions):
+        doc = {
+            "name": names[i],
+            "type": "COMMUNITY" if i % 3 else "INTERNAL",
+            "status": "ACTIVE" if i % 4 else "CLOSED",
+            "architectId": architects[i % len(architects)],
+            "createdAt": now - timedelta(hours=i),
+        }
+        mission_docs.append((f"{SEED_PREFIX}-mission-{i}", doc))
+        writes.append({"update": {"name": f"{root}/missions/{SEED_PREFIX}-mission-{i}", "fields": {k: to_value(v) for k, v in doc.items()}}})
+    for i in range(anomalies):
+        # Skewed towards the first missions, like real feedback volume
+        mission_id, mission = mission_docs[min(int(rng.expovariate(3 / missions)), missions - 1)]
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+        doc = {
+            "missionId": mission_id,
+            "missionName": mission["name"],
+            "architectId": mission["architectId"],
+            "severity": rng.choice(SEVERITIES),
+            "status": "OPEN" if rng.random() < 0.7 else "RESOLVED",
+            "title": rng.choice(TITLES),
+            "createdAt": created,
+            "timestamp": created,
+        }
+        writes.append({"update": {"name": f"{root}/anomalies/{SEED_PREFIX}-anomaly-{i}", "fields": {k: to_value(v) for k, v in doc.items()}}})
+    started = time.perf_counter()
+    emulator.commit(writes)
+    print(f"[SEED] {missions} missions, {anomalies} anomalies in {time.perf_counter() - started:.1f}s",
+          file=sys.stderr)
+    return {"uid": architects[0], "mission": mission_docs[0][0]}
+
+
+def bench_compile(workload, advisor, rounds):
+    # Cold: every query parsed, planned and index-checked from scratch.
+    # Cached: the same workload through one PlanCache.
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in workload:
+            shape, template, _ = canonicalize(parse(text))
+            advisor.check(Plan(shape, template, advisor.exempt.get(template["collection"], ())))
+    cold = (time.perf_counter() - started) / (rounds * len(workload))
+
+    cache = PlanCache(advisor=advisor)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in workload:
+            cache.compile(text)
+    cached = (time.perf_counter() - started) / (rounds * len(workload))
+    return {"cold_us": round(cold * 1e6, 1), "cached_us": round(cached * 1e6, 1),
+            "speedup": round(cold / cached, 1) if cached else None, "cache": cache.info()}
+
+
+def bench_queries(emulator, cache, workload, params, runs):
+    results = []
+    for text in workload:
+        plan, advice, values = cache.compile(text)
+        query = plan.structured_query(values, params)
+        durations = []
+        fetched = returned = 0
+        for _ in range(runs):
+            started = time.perf_counter()
+            rows = emulator.run_query(query)
+            rows_out = plan.filter_rows(rows, values, params)
+            durations.append((time.perf_counter() - started) * 1000)
+            fetched, returned = len(rows), len(rows_out)
+        result = {
+            "query": text,
+            "index": advice["status"],
+            "client_filters": advice["client_filters"],
+            "p50_ms": round(percentile(durations, 50), 2),
+            "p95_ms": round(percentile(durations, 95), 2),
+            "fetched": fetched,
+            "returned": returned,
+            "overfetch": round(fetched / returned, 1) if returned else None,
+        }
+        results.append(result)
+        flag = "[MISSING]" if advice["status"] == "missing" else "[QUERY]"
+        print(f"{flag} p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, "
+              f"{fetched} fetched -> {returned} returned: {text}", file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark BMQL plans against the Firestore emulator.")
+    parser.add_argument("--host", default=FIRESTORE_HOST, help="emulator host:port (default: FIRESTORE_EMULATOR_HOST)")
+    parser.add_argument("--project", default=default_project(), help="Firebase project id (default: .firebaserc)")
+    parser.add_argument("--indexes", default=INDEXES_PATH, help=f"index definitions (default: {INDEXES_PATH})")
+    parser.add_argument("--missions", type=int, default=50, help="missions to seed (default: 50)")
+    parser.add_argument("--anomalies", type=int, default=2000, help="anomalies to seed (default: 2000)")
+    parser.add_argument("--no-seed", action="store_true", help="query the data already in the emulator")
+    parser.add_argument("--runs", type=int, default=20, help="executions per query (default: 20)")
+    parser.add_argument("--compile-rounds", type=int, default=2000,
+                        help="passes over the workload for the compile benchmark (default: 2000)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the generated data")
+    parser.add_argument("--compile-only", action="store_true", help="skip the emulator")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        advisor = IndexAdvisor.from_file(args.indexes)
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Can't read {args.indexes} ({e}); assuming no composite indexes", file=sys.stderr)
+        advisor = IndexAdvisor()
+    workload = APP_QUERIES + WORKLOAD_VARIANTS
+
+    compiled = bench_compile(workload, advisor, max(1, args.compile_rounds))
+    print(f"[COMPILE] {compiled['cold_us']} us cold, {compiled['cached_us']} us cached "
+          f"({compiled['speedup']}x), hit rate {compiled['cache']['hit_rate']:.0%}", file=sys.stderr)
+    report = {"compile": compiled}
+
+    if not args.compile_only:
+        emulator = Emulator(args.host, args.project)
+        try:
+            if args.no_seed:
+                params = {"uid": f"{SEED_PREFIX}-architect-0", "mission": f"{SEED_PREFIX}-mission-0"}
+            else:
+                params = seed(emulator, args.project, max(2, args.missions), args.anomalies,
+                              random.Random(args.seed))
+            cache = PlanCache(advisor=advisor)
+            report["queries"] = bench_queries(emulator, cache, workload, params, max(1, args.runs))
+        except (OSError, RuntimeError) as e:
+            print(f"[ERROR] Emulator at {args.host}: {e}. Start it with "
+                  f"`firebase emulators:start --only firestore`.", file=sys.stderr)
+            return 1
+        except BMQLError as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            return 1
+        finally:
+            emulator.close()
+        missing = [r for r in report["queries"] if r["index"] == "missing"]
+        if missing:
+            print(f"[WARN] {len(missing)} queries need composite indexes that firestore.indexes.json "
+                  f"doesn't declare; the emulator runs them anyway, production won't. "
+                  f"See `python experiments/bmql.py`.", file=sys.stderr)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from playwright.sync_api import sync_playwright
+
+from shared_browser import launch_browser
+from trace_report import compare, percentile
+
+# Cold/warm start of the two built web apps, frontend/ and betamax-portal/.
+# Each dist/ is served locally the way Firebase Hosting serves it (gzip, SPA
+# rewrite, immutable hashed assets) and loaded under desktop and emulated
+# mobile network/CPU profiles, since the same bundle ships inside Capacitor.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "test_reports", "benchmarks")
+
+APPS = {
+    "frontend": os.path.join(ROOT, "frontend"),
+    "portal": os.path.join(ROOT, "betamax-portal"),
+}
+
+# The auth form both apps render once their loading screen is gone
+AUTH_INPUT = "[data-testid='email-input']"
+
+# latency in ms, throughput in bytes/s (DevTools / Lighthouse presets), CPU slowdown
+PROFILES = {
+    "desktop": {"latency": 0, "down": -1, "up": -1, "cpu": 1, "mobile": False},
+    "mobile-4g": {"latency": 150, "down": 1.6 * 1024 * 1024 / 8, "up": 750 * 1024 / 8, "cpu": 4, "mobile": True},
+    "mobile-3g": {"latency": 562.5, "down": 180 * 1024, "up": 84.375 * 1024, "cpu": 4, "mobile": True},
+}
+MOBILE_CONTEXT = {
+    "viewport": {"width": 412, "height": 915},
+    "device_scale_factor": 2.625,
+    "is_mobile": True,
+    "has_touch": True,
+    "user_agent": "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/124.0.0.0 Mobile Safari/537.36",
+}
+
+COMPRESSIBLE = (".html", ".js", ".css", ".svg", ".json", ".txt")
+
+# Installed before any app code: records long tasks and the moment the auth
+# form is on screen and enabled
+STARTUP_PROBE_JS = """
+(selector) => {
+  window.__startup = { longTasks: [], formVisible: null };
+  try {
+    new PerformanceObserver((list) => {
+      for (const t of list.getEntries()) window.__startup.longTasks.push([t.startTime, t.duration]);
+    }).observe({ type: 'longtask', buffered: true });
+  } catch (e) {}
+  const check = () => {
+    const input = document.querySelector(selector);
+    if (input && input.offsetParent !== null && !input.disabled) {
+      requestAnimationFrame(() => setTimeout(() => {
+        if (window.__startup.formVisible === null) window.__startup.formVisible = performance.now();
+      }, 0));
+      observer.disconnect();
+    }
+  };
+  const observer = new MutationObserver(check);
+  observer.observe(document, { childList: true, subtree: true, attributes: true });
+}
+"""
+
+# Resolves once the form is up and the main thread has been free of long tasks
+# for `quiet` ms; interactive = form visible, or the end of the last long task
+COLLECT_JS = """
+async (quiet) => {
+  const s = window.__startup;
+  const lastEnd = () => s.longTasks.reduce((m, [start, d]) => Math.max(m, start + d), 0);
+  const deadline = performance.now() + 30000;
+  while (s.formVisible === null || performance.now() - Math.max(lastEnd(), s.formVisible) < quiet) {
+    if (performance.now() > deadline) break;
+    await new Promise((r) => setTimeout(r, 50));
+  }
+  const paint = Object.fromEntries(performance.getEntriesByType('paint').map((p) => [p.name, p.startTime]));
+  const nav = performance.getEntriesByType('navigation')[0] || {};
+  const resources = performance.getEntriesByType('resource');
+  const isScript = (r) => r.initiatorType === 'script' || /\\.m?js(\\?|$)/.test(r.name);
+  const scripts = resources.filter(isScript);
+  const sum = (list, key) => list.reduce((total, r) => total + (r[key] || 0), 0);
+  return {
+    first_paint: paint['first-paint'] || null,
+    first_contentful_paint: paint['first-contentful-paint'] || null,
+    dom_content_loaded: nav.domContentLoadedEventEnd || null,
+    form_visible: s.formVisible,
+    interactive: s.formVisible === null ? null : Math.max(s.formVisible, lastEnd()),
+    long_tasks: s.longTasks.length,
+    long_task_ms: s.longTasks.reduce((total, [, d]) => total + d, 0),
+    requests: resources.length + 1,
+    transfer_bytes: sum(resources, 'transferSize') + (nav.transferSize || 0),
+    js_requests: scripts.length,
+    js_bytes: sum(scripts, 'decodedBodySize'),
+    js_transfer_bytes: sum(scripts, 'transferSize'),
+  };
+}
+"""
+
+TIMED_METRICS = ("first_paint", "first_contentful_paint", "form_visible", "interactive")
+SIZE_METRICS = ("requests", "transfer_bytes", "js_requests", "js_bytes", "js_transfer_bytes", "long_tasks")
+
+
+class DistHandler(SimpleHTTPRequestHandler):
+    # Static dist/ server with Firebase Hosting's behaviour: rewrite unknown
+    # routes to index.html, gzip text, cache hashed assets forever
+    gzip_cache = {}
+
+    def log_message(self, *args):
+        pass
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not os.path.exists(path):
+            self.path = "/index.html"
+            path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(COMPRESSIBLE) or "gzip" not in self.headers.get("Accept-Encoding", ""):
+            return super().send_head()
+
+        body = self.gzip_cache.get(path)
+        if body is None:
+            with open(path, "rb") as f:
+                body = self.gzip_cache[path] = gzip.compress(f.read(), 6)
+        self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return None
+
+    def end_headers(self):
+        immutable = self.path.startswith("/assets/")
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable" if immutable else "no-cache")
+        super().end_headers()
+
+
+def serve(dist):
+    handler = type("Handler", (DistHandler,), {"gzip_cache": {}})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), lambda *a: handler(*a, directory=dist))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def build_info(app_dir):
+    # Identifies the build so results from different builds stay comparable
+    dist = os.path.join(app_dir, "dist")
+    digest = hashlib.sha256()
+    js_bytes = 0
+    files = 0
+    for folder, _, names in sorted(os.walk(dist)):
+        for name in sorted(names):
+            path = os.path.join(folder, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            digest.update(os.path.relpath(path, dist).encode() + data)
+            files += 1
+            if name.endswith(".js"):
+                js_bytes += len(data)
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {"build": digest.hexdigest()[:12], "commit": commit, "files": files, "js_bytes_on_disk": js_bytes}
+
+
+def load_once(context, url, profile, warm_up=False):
+    page = context.new_page()
+    cdp = context.new_cdp_session(page)
+    cdp.send("Network.enable")
+    cdp.send("Network.emulateNetworkConditions", {
+        "offline": False, "latency": profile["latency"],
+        "downloadThroughput": profile["down"], "uploadThroughput": profile["up"],
+    })
+    cdp.send("Emulation.setCPUThrottlingRate", {"rate": profile["cpu"]})
+    page.add_init_script(f"({STARTUP_PROBE_JS})({json.dumps(AUTH_INPUT)})")
+    page.goto(url)
+    metrics = None if warm_up else page.evaluate(COLLECT_JS, 500)
+    page.close()
+    return metrics
+
+
+def bench_app(browser, url, profile, runs):
+    samples = {"cold": [], "warm": []}
+    options = MOBILE_CONTEXT if profile["mobile"] else {}
+    for run in range(runs):
+        # A fresh context has an empty HTTP cache: the first load is cold,
+        # a second page in the same context loads warm
+        context = browser.new_context(**options)
+        try:
+            samples["cold"].append(load_once(context, url, profile))
+            samples["warm"].append(load_once(context, url, profile))
+        finally:
+            context.close()
+        form = samples["cold"][-1]["interactive"]
+        print(f"  run {run + 1}/{runs}: cold interactive "
+              f"{'n/a' if form is None else f'{form:.0f}ms'}, warm {samples['warm'][-1]['interactive'] or 0:.0f}ms")
+    return samples
+
+
+def summarize(samples):
+    summary = {}
+    for key in TIMED_METRICS:
+        values = [s[key] for s in samples if s[key] is not None]
+        summary[key] = {
+            "p50": round(percentile(values, 50), 1),
+            "p95": round(percentile(values, 95), 1),
+            "missing": len(samples) - len(values),
+        }
+    for key in SIZE_METRICS:
+        summary[key] = round(percentile([s[key] for s in samples], 50))
+    return summary
+
+
+def flatten(results):
+    # {"frontend/mobile-4g/cold.interactive": {"p95": ...}} for trace_report.compare
+    flat = {}
+    for app, profiles in results.items():
+        for profile, loads in profiles.items():
+            for load, summary in loads.items():
+                for key in TIMED_METRICS:
+                    flat[f"{app}/{profile}/{load}.{key}"] = summary[key]
+    return flat
+
+
+def print_table(results):
+    print(f"\n{'app / profile / load':<30} {'FCP p50':>9} {'TTI p50':>9} {'TTI p95':>9} "
+          f"{'reqs':>5} {'JS parsed':>10} {'JS xfer':>9}")
+    for app, profiles in results.items():
+        for profile, loads in profiles.items():
+            for load, s in loads.items():
+                print(f"{f'{app} / {profile} / {load}':<30} {s['first_contentful_paint']['p50']:>7.0f}ms "
+                      f"{s['interactive']['p50']:>7.0f}ms {s['interactive']['p95']:>7.0f}ms {s['requests']:>5} "
+                      f"{s['js_bytes'] / 1024:>8.0f}KB {s['js_transfer_bytes'] / 1024:>7.0f}KB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold and warm start of the built web apps.")
+    parser.add_argument("--apps", nargs="+", choices=sorted(APPS), default=sorted(APPS))
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=["desktop", "mobile-4g"])
+    parser.add_argument("--runs", type=int, default=5, help="cold+warm load pairs per app and profile")
+    parser.add_argument("--build", action="store_true", help="run `npm run build` in each app first")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="relative p95 slowdown vs. baseline that fails the run (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    builds = {}
+    for app in args.apps:
+        if args.build:
+            print(f"Building {app}...")
+            subprocess.run(["npm", "run", "build"], cwd=APPS[app], check=True)
+        if not os.path.exists(os.path.join(APPS[app], "dist", "index.html")):
+            print(f"❌ {app}: no build at {os.path.relpath(APPS[app], ROOT)}/dist (run with --build)")
+            return 1
+        builds[app] = build_info(APPS[app])
+
+    results = {}
+    with sync_playwright() as p:
+        browser = launch_browser(p, headless=not args.headed)
+        try:
+            for app in args.apps:
+                server, url = serve(os.path.join(APPS[app], "dist"))
+                try:
+                    # One throwaway load so the server's gzip cache is filled
+                    context = browser.new_context()
+                    load_once(context, url, PROFILES["desktop"], warm_up=True)
+                    context.close()
+                    results[app] = {}
+                    for name in args.profiles:
+                        print(f"{app} ({builds[app]['build']}) under {name}...")
+                        samples = bench_app(browser, url, PROFILES[name], args.runs)
+                        results[app][name] = {load: summarize(s) for load, s in samples.items()}
+                finally:
+                    server.shutdown()
+        finally:
+            browser.close()
+
+    print_table(results)
+    report = {"runs": args.runs, "builds": builds, "profiles": {n: PROFILES[n] for n in args.profiles},
+              "results": results, "flat": flatten(results)}
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = os.path.join(RESULTS_DIR, f"startup-{int(time.time())}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    failures = []
+    for app, profiles in results.items():
+        for profile, loads in profiles.items():
+            if loads["cold"]["interactive"]["missing"]:
+                failures.append(f"{app} / {profile}: auth form never became interactive in some runs")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for app, info in baseline.get("builds", {}).items():
+            if app in builds and info["build"] != builds[app]["build"]:
+                print(f"Comparing {app} build {builds[app]['build']} against baseline build {info['build']}")
+        for key, before, after in compare(report["flat"], baseline["flat"], args.tolerance):
+            failures.append(f"{key}: p95 {before:.0f}ms -> {after:.0f}ms vs. baseline")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Startup benchmarks complete.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
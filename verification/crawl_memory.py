@@ -0,0 +1,221 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from playwright.sync_api import sync_playwright
+
+from auth_fixtures import TARGETS, logged_in_page
+from shared_browser import launch_browser
+
+# Route-cycling memory-leak detector. Walks Dashboard -> Missions -> Mission
+# Details -> back -> Terminal (on the portal: Dashboard -> Project -> back ->
+# Feedback -> Profile) the way a tester does over a long session and,
+# after a forced GC at every stop, records the retained JS heap plus DOM node
+# and listener counts. Steady growth per cycle at the same route is a leak.
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "test_reports", "benchmarks")
+
+# Growth per cycle (after GC) that is reported as a leak
+LEAK_BYTES_PER_CYCLE = 100 * 1024
+LEAK_NODES_PER_CYCLE = 50
+LEAK_LISTENERS_PER_CYCLE = 10
+
+# Per app: (route name, clicks that get there, what proves it rendered). "back"
+# is navigate(-1) from the detail page, i.e. the dashboard. The portal
+# (PrototypeApp) has no test ids, and its feedback form hides the bottom nav,
+# so the form is left with Cancel.
+ROUTES = {
+    "frontend": [
+        ("dashboard", ["[data-testid='nav-dashboard']"], "[data-testid^='project-card-']"),
+        ("missions", ["[data-testid='nav-missions']"], "[data-testid='mission-search']"),
+        ("mission_details", ["[data-testid='nav-dashboard']", "[data-testid^='project-card-']"],
+         "text=Testing Scope"),
+        ("back", ["button:has(.lucide-arrow-left)"], "[data-testid^='project-card-']"),
+        ("terminal", ["[data-testid='nav-terminal']"], "[data-testid='terminal-input']"),
+    ],
+    "portal": [
+        ("dashboard", ["nav button:has-text('Home')"], "text=Assigned Projects"),
+        ("project_detail", ["button:has-text('Neon Wallet')"], "text=Testing Scope"),
+        ("back", ["button[aria-label='Go back']"], "text=Assigned Projects"),
+        ("feedback_form", ["button[aria-label='Add feedback']"], "#title-input"),
+        ("cancel", ["button:has-text('Cancel')"], "text=Assigned Projects"),
+        ("profile", ["nav button:has-text('Profile')"], "img[alt='User']"),
+    ],
+}
+
+
+def visit(page, clicks, ready, timeout):
+    for selector in clicks:
+        page.locator(selector).first.click()
+    page.locator(ready).first.wait_for(timeout=timeout)
+
+
+def measure(cdp):
+    # Forced full GC first, so what's left is what the app is holding on to
+    cdp.send("HeapProfiler.collectGarbage")
+    heap = cdp.send("Runtime.getHeapUsage")
+    metrics = {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}
+    return {
+        "heap_used": heap["usedSize"],
+        "nodes": int(metrics.get("Nodes", 0)),
+        "listeners": int(metrics.get("JSEventListeners", 0)),
+        "documents": int(metrics.get("Documents", 0)),
+    }
+
+
+def take_snapshot(cdp):
+    chunks = []
+    handler = lambda params: chunks.append(params["chunk"])
+    cdp.on("HeapProfiler.addHeapSnapshotChunk", handler)
+    try:
+        cdp.send("HeapProfiler.collectGarbage")
+        cdp.send("HeapProfiler.takeHeapSnapshot", {"reportProgress": False})
+    finally:
+        cdp.remove_listener("HeapProfiler.addHeapSnapshotChunk", handler)
+    return json.loads("".join(chunks))
+
+
+def aggregate_snapshot(snapshot):
+    # {object type: [count, self size]} from the flat V8 node array
+    meta = snapshot["snapshot"]["meta"]
+    fields = meta["node_fields"]
+    type_names = meta["node_types"][0]
+    stride = len(fields)
+    type_i, name_i, size_i = fields.index("type"), fields.index("name"), fields.index("self_size")
+    nodes, strings = snapshot["nodes"], snapshot["strings"]
+
+    totals = {}
+    for i in range(0, len(nodes), stride):
+        node_type = type_names[nodes[i + type_i]]
+        if node_type in ("object", "native"):
+            key = strings[nodes[i + name_i]]
+        elif node_type == "closure":
+            key = "(closure)"
+        else:
+            key = f"({node_type})"
+        entry = totals.setdefault(key, [0, 0])
+        entry[0] += 1
+        entry[1] += nodes[i + size_i]
+    return totals
+
+
+def top_growth(before, after, limit=15):
+    growth = []
+    for key, (count, size) in after.items():
+        old_count, old_size = before.get(key, (0, 0))
+        if size > old_size:
+            growth.append({"type": key, "count_delta": count - old_count, "size_delta": size - old_size})
+    growth.sort(key=lambda g: g["size_delta"], reverse=True)
+    return growth[:limit]
+
+
+def slope(values):
+    # Least-squares growth per cycle
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    num = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    den = sum((x - mean_x) ** 2 for x in range(n))
+    return num / den
+
+
+def crawl(browser, target, cycles, snapshots, warmup):
+    timeout = TARGETS[target]["timeout"]
+    routes = ROUTES[target]
+    page = logged_in_page(browser, target)
+    cdp = page.context.new_cdp_session(page)
+    cdp.send("Performance.enable")
+
+    # The first passes fill caches and lazy chunks; don't count them as leaks
+    for _ in range(warmup):
+        for _, clicks, ready in routes:
+            visit(page, clicks, ready, timeout)
+
+    before = aggregate_snapshot(take_snapshot(cdp)) if snapshots else None
+    samples = {name: [] for name, _, _ in routes}
+    started = time.perf_counter()
+    for cycle in range(cycles):
+        for name, clicks, ready in routes:
+            visit(page, clicks, ready, timeout)
+            samples[name].append(measure(cdp))
+        heap_mb = samples[routes[0][0]][-1]["heap_used"] / 1024 / 1024
+        print(f"Cycle {cycle + 1}/{cycles}: heap at dashboard {heap_mb:.1f} MB")
+    elapsed = time.perf_counter() - started
+
+    growth = top_growth(before, aggregate_snapshot(take_snapshot(cdp))) if snapshots else []
+    page.context.close()
+    return samples, growth, elapsed
+
+
+def analyze(samples):
+    routes = {}
+    leaks = []
+    for name, points in samples.items():
+        stats = {
+            "heap_first": points[0]["heap_used"],
+            "heap_last": points[-1]["heap_used"],
+            "heap_per_cycle": round(slope([p["heap_used"] for p in points])),
+            "nodes_per_cycle": round(slope([p["nodes"] for p in points]), 1),
+            "listeners_per_cycle": round(slope([p["listeners"] for p in points]), 1),
+        }
+        routes[name] = stats
+        if stats["heap_per_cycle"] > LEAK_BYTES_PER_CYCLE:
+            leaks.append(f"{name}: retained heap grows {stats['heap_per_cycle'] / 1024:.0f} KB per cycle")
+        if stats["nodes_per_cycle"] > LEAK_NODES_PER_CYCLE:
+            leaks.append(f"{name}: {stats['nodes_per_cycle']:.0f} DOM nodes retained per cycle")
+        if stats["listeners_per_cycle"] > LEAK_LISTENERS_PER_CYCLE:
+            leaks.append(f"{name}: {stats['listeners_per_cycle']:.0f} event listeners retained per cycle")
+    return routes, leaks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cycle through portal routes and watch for memory leaks.")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="frontend",
+                        help="app to crawl (default: frontend on :3000)")
+    parser.add_argument("--cycles", type=int, default=20, help="route cycles to measure (default: 20)")
+    parser.add_argument("--warmup", type=int, default=2, help="unmeasured cycles first (default: 2)")
+    parser.add_argument("--no-snapshots", action="store_true",
+                        help="skip the before/after heap snapshots (faster, no per-type breakdown)")
+    args = parser.parse_args(argv)
+
+    print(f"Crawling {args.target} for {args.cycles} cycles ({args.warmup} warm-up)...")
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+        try:
+            samples, growth, elapsed = crawl(browser, args.target, args.cycles,
+                                             not args.no_snapshots, args.warmup)
+        finally:
+            browser.close()
+
+    routes, leaks = analyze(samples)
+    print(f"\n{'route':<16} {'heap first':>11} {'heap last':>11} {'per cycle':>11} {'nodes/c':>8} {'lsnr/c':>7}")
+    for name, stats in routes.items():
+        print(f"{name:<16} {stats['heap_first'] / 1048576:>9.1f}MB {stats['heap_last'] / 1048576:>9.1f}MB "
+              f"{stats['heap_per_cycle'] / 1024:>9.1f}KB {stats['nodes_per_cycle']:>8.1f} "
+              f"{stats['listeners_per_cycle']:>7.1f}")
+    if growth:
+        print("\nTop growing object types:")
+        for g in growth:
+            print(f"  {g['type'][:48]:<48} {g['size_delta'] / 1024:>9.1f}KB  ({g['count_delta']:+d} objects)")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = os.path.join(RESULTS_DIR, f"crawl-{args.target}-{int(time.time())}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"target": args.target, "cycles": args.cycles, "elapsed_s": round(elapsed, 1),
+                   "routes": routes, "top_growth": growth, "leaks": leaks, "samples": samples}, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    for leak in leaks:
+        print(f"❌ {leak}")
+    if not leaks:
+        print("✅ No steady growth detected.")
+    return 1 if leaks else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,511 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from auth_fixtures import TARGETS, load_state
+from shared_browser import launch_browser
+from trace_report import percentile
+
+# The Firestore REST codec is shared with the BMQL compiler in experiments/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "experiments"))
+from firestore_rest import AUTH_HOST, FIRESTORE_HOST, OWNER_TOKEN, default_project, from_value, to_value  # noqa: E402
+
+# Simulated testers ("scouts") hitting the app concurrently. Two modes:
+#   api - each tester talks straight to the Firebase Auth and Firestore
+#         emulators with the same reads/writes the app makes, so the security
+#         rules are exercised at hundreds of testers. The emulator does not
+#         enforce composite indexes; experiments/bmql.py checks index coverage.
+#   ui  - each tester is a browser context running the verification flows:
+#         login -> dashboard -> mission detail -> submit report. Refuses to run
+#         unless the app was started with VITE_USE_EMULATORS=true (or demo mode)
+# Testers ramp up linearly and loop sessions until the run ends.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "test_reports", "benchmarks")
+
+TESTER_PASSWORD = "test1234"
+# Production Firebase endpoints; UI testers must never reach them
+PRODUCTION_HOSTS = ("identitytoolkit.googleapis.com", "securetoken.googleapis.com", "firestore.googleapis.com")
+SEVERITIES = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+
+class ApiError(Exception):
+    def __init__(self, status, body):
+        super().__init__(f"HTTP {status}: {body[:200]}")
+        self.status = status
+
+
+class EmulatorHttp:
+    # Minimal keep-alive HTTP/1.1 JSON client on asyncio streams; the emulators
+    # are plain HTTP on localhost, so this is all a tester needs
+
+    def __init__(self, hostport, max_connections=200):
+        host, _, port = hostport.rpartition(":")
+        self.host = host
+        self.port = int(port)
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def request(self, method, path, body=None, token=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        headers = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                   f"Content-Length: {len(payload)}", "Content-Type: application/json"]
+        if token:
+            headers.append(f"Authorization: Bearer {token}")
+        raw = ("\r\n".join(headers) + "\r\n\r\n").encode("ascii") + payload
+
+        async with self._slots:
+            for attempt in range(2):
+                reused = bool(self._idle)
+                reader, writer = self._idle.pop() if reused else await asyncio.open_connection(self.host, self.port)
+                try:
+                    writer.write(raw)
+                    await writer.drain()
+                    status, keep_alive, data = await self._read_response(reader)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    writer.close()
+                    # An idle connection the server already closed; retry once on a new one
+                    if reused and attempt == 0:
+                        continue
+                    raise
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                break
+
+        text = data.decode("utf-8", errors="replace")
+        if status >= 400:
+            raise ApiError(status, text)
+        return json.loads(text) if text.strip() else None
+
+    async def _read_response(self, reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            data = b"".join(chunks)
+        elif "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        else:
+            return status, False, await reader.read()
+        return status, headers.get("connection", "").lower() != "close", data
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle = []
+
+
+class Firestore:
+    # The handful of Firestore REST calls the app's SDK calls boil down to
+
+    def __init__(self, http, project):
+        self.http = http
+        self.root = f"projects/{project}/databases/(default)/documents"
+
+    def _path(self, suffix=""):
+        return f"/v1/{self.root}{suffix}"
+
+    async def get(self, token, collection, doc_id):
+        # None for a missing document, like getDoc().exists() == false
+        try:
+            doc = await self.http.request("GET", self._path(f"/{collection}/{doc_id}"), token=token)
+        except ApiError as e:
+            if e.status != 404:
+                raise
+            return None
+        return {k: from_value(v) for k, v in doc.get("fields", {}).items()}
+
+    async def query(self, token, collection, where=(), order_by=None, limit=None):
+        filters = [{"fieldFilter": {"field": {"fieldPath": field}, "op": op, "value": to_value(value)}}
+                   for field, op, value in where]
+        structured = {"from": [{"collectionId": collection}]}
+        if len(filters) == 1:
+            structured["where"] = filters[0]
+        elif filters:
+            structured["where"] = {"compositeFilter": {"op": "AND", "filters": filters}}
+        if order_by:
+            field, direction = order_by
+            structured["orderBy"] = [{"field": {"fieldPath": field}, "direction": direction}]
+        if limit:
+            structured["limit"] = limit
+        rows = await self.http.request("POST", self._path(":runQuery"), {"structuredQuery": structured}, token)
+        return [(row["document"]["name"].rsplit("/", 1)[1],
+                 {k: from_value(v) for k, v in row["document"].get("fields", {}).items()})
+                for row in rows if "document" in row]
+
+    async def create(self, token, collection, fields, doc_id=None, server_time=()):
+        # addDoc/setDoc with serverTimestamp() fields, as one commit
+        doc_id = doc_id or "".join(random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=20))
+        write = {
+            "update": {"name": f"{self.root}/{collection}/{doc_id}",
+                       "fields": {k: to_value(v) for k, v in fields.items()}},
+            "currentDocument": {"exists": False},
+        }
+        if server_time:
+            write["updateTransforms"] = [{"fieldPath": f, "setToServerValue": "REQUEST_TIME"} for f in server_time]
+        await self.http.request("POST", self._path(":commit"), {"writes": [write]}, token)
+        return doc_id
+
+    async def increment(self, token, collection, doc_id, field, by=1):
+        write = {"transform": {"document": f"{self.root}/{collection}/{doc_id}",
+                               "fieldTransforms": [{"fieldPath": field, "increment": to_value(by)}]}}
+        await self.http.request("POST", self._path(":commit"), {"writes": [write]}, token)
+
+
+class AuthEmulator:
+    def __init__(self, http, project):
+        self.http = http
+        self.project = project
+
+    async def sign_in(self, email, password):
+        # Returns (uid, id token); creates the account the first time
+        body = {"email": email, "password": password, "returnSecureToken": True}
+        base = "/identitytoolkit.googleapis.com/v1/accounts"
+        try:
+            result = await self.http.request("POST", f"{base}:signInWithPassword?key=fake-api-key", body)
+        except ApiError as e:
+            if e.status != 400:
+                raise
+            result = await self.http.request("POST", f"{base}:signUp?key=fake-api-key", body)
+        return result["localId"], result["idToken"]
+
+
+class Stats:
+    def __init__(self):
+        self.ops = {}
+        self.started = time.perf_counter()
+        self.active = 0
+
+    def record(self, name, ms, error=None):
+        entry = self.ops.setdefault(name, {"ms": [], "errors": {}})
+        if error is None:
+            entry["ms"].append(ms)
+        else:
+            entry["errors"][error] = entry["errors"].get(error, 0) + 1
+
+    async def timed(self, name, awaitable):
+        # Runs one operation; returns (ok, result) and never raises
+        started = time.perf_counter()
+        try:
+            result = await awaitable
+        except ApiError as e:
+            self.record(name, 0, f"HTTP {e.status}")
+            return False, None
+        except Exception as e:
+            self.record(name, 0, type(e).__name__)
+            return False, None
+        self.record(name, (time.perf_counter() - started) * 1000)
+        return True, result
+
+    def totals(self):
+        ok = sum(len(e["ms"]) for e in self.ops.values())
+        errors = sum(sum(e["errors"].values()) for e in self.ops.values())
+        return ok, errors
+
+    def summary(self, elapsed):
+        summary = {}
+        for name, entry in sorted(self.ops.items()):
+            ok = len(entry["ms"])
+            errors = sum(entry["errors"].values())
+            summary[name] = {
+                "count": ok + errors,
+                "per_second": round((ok + errors) / elapsed, 2),
+                "error_rate": round(errors / (ok + errors), 4) if ok + errors else 0.0,
+                "errors": entry["errors"],
+                "p50": round(percentile(entry["ms"], 50), 1),
+                "p95": round(percentile(entry["ms"], 95), 1),
+                "p99": round(percentile(entry["ms"], 99), 1),
+                "max": round(max(entry["ms"]), 1) if entry["ms"] else 0.0,
+            }
+        return summary
+
+
+async def think(scale):
+    await asyncio.sleep(random.uniform(0.5, 2.0) * scale)
+
+
+async def prepare_emulators(args, firestore, auth, accounts=()):
+    # --reset wipes both emulators, then the given accounts and --seed missions are created
+    if args.reset:
+        await firestore.http.request("DELETE", f"/emulator/v1/projects/{args.project}/databases/(default)/documents")
+        await auth.http.request("DELETE", f"/emulator/v1/projects/{args.project}/accounts")
+    for email, password in accounts:
+        await auth.sign_in(email, password)
+    if args.seed:
+        await seed(firestore, args.seed)
+
+
+async def seed(firestore, missions):
+    # An architect with ACTIVE community missions for the testers to browse
+    architect = "loadtest-architect"
+    await firestore.create(OWNER_TOKEN, "users", {"uid": architect, "role": "developer",
+                                                  "email": "architect@betamax.test"}, doc_id=architect)
+    ids = []
+    for i in range(missions):
+        ids.append(await firestore.create(OWNER_TOKEN, "missions", {
+            "name": f"Load Test Mission {i + 1}", "type": "COMMUNITY", "status": "ACTIVE",
+            "architectId": architect, "bugsFound": 0,
+        }, server_time=("createdAt",)))
+    return ids
+
+
+async def api_tester(index, firestore, auth, stats, stop_at, think_scale):
+    # One scout's session loop, mirroring the SDK calls behind each screen
+    email = f"scout{index}@betamax.test"
+    ok, signed_in = await stats.timed("auth.sign_in", auth.sign_in(email, TESTER_PASSWORD))
+    if not ok:
+        return
+    uid, token = signed_in
+    ok, profile = await stats.timed("users.get_profile", firestore.get(token, "users", uid))
+    if ok and profile is None:
+        # Onboarding: first login creates the tester profile
+        await stats.timed("users.create_profile", firestore.create(
+            token, "users", {"uid": uid, "email": email, "role": "tester"}, doc_id=uid))
+
+    while time.perf_counter() < stop_at:
+        # Dashboard: active missions plus the anomaly feed listener
+        ok, missions = await stats.timed("dashboard.list_missions", firestore.query(
+            token, "missions", [("status", "EQUAL", "ACTIVE")]))
+        await stats.timed("dashboard.list_anomalies", firestore.query(
+            token, "anomalies", order_by=("timestamp", "DESCENDING"), limit=50))
+        if not ok or not missions:
+            await think(think_scale)
+            continue
+        await think(think_scale)
+
+        # Mission detail + enrollment check
+        mission_id, mission = random.choice(missions)
+        await stats.timed("mission.get", firestore.get(token, "missions", mission_id))
+        ok, enrolled = await stats.timed("enrollments.query", firestore.query(
+            token, "enrollments", [("missionId", "EQUAL", mission_id), ("userId", "EQUAL", uid)]))
+        if ok and not enrolled:
+            await stats.timed("enrollments.create", firestore.create(
+                token, "enrollments", {"missionId": mission_id, "userId": uid, "userEmail": email,
+                                       "status": "ENROLLED"}, server_time=("joinedAt",)))
+        await think(think_scale)
+
+        # Submit report: AnomalyReportForm's addDoc + bugsFound increment
+        await stats.timed("anomalies.create", firestore.create(token, "anomalies", {
+            "missionId": mission_id, "missionName": mission.get("name", ""),
+            "architectId": mission.get("architectId", ""), "reporterId": uid, "reporterEmail": email,
+            "severity": random.choice(SEVERITIES), "status": "OPEN",
+            "title": f"Load test anomaly from scout {index}", "description": "Generated by load_testers.py",
+        }, server_time=("createdAt",)))
+        await stats.timed("missions.increment_bugs", firestore.increment(token, "missions", mission_id, "bugsFound"))
+        await think(think_scale)
+
+
+async def ui_login(page, config, email):
+    await page.wait_for_selector(config["login_ready"], timeout=config["timeout"])
+    await page.fill(config["email"], email)
+    await page.fill(config["password"], config["accounts"][email])
+    await page.click(config["submit"])
+    await page.wait_for_selector(config["ready"], timeout=config["timeout"])
+
+
+async def block_production(route):
+    await route.abort("blockedbyclient")
+
+
+async def app_backend(browser):
+    # What the served app talks to: "emulators", "demo", or None (production)
+    config = TARGETS["frontend"]
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
+        await page.goto(config["url"])
+        await page.wait_for_selector(config["login_ready"], timeout=config["timeout"])
+        return await page.evaluate("window.__BETAMAX_BACKEND__ || null")
+    finally:
+        await context.close()
+
+
+async def ui_tester(index, browser, stats, stop_at, think_scale, use_cache):
+    # verify_a11y.py / verify_project_detail.py flows on the :3000 app
+    config = TARGETS["frontend"]
+    emails = sorted(config["accounts"])
+    email = emails[index % len(emails)]
+    state = load_state("frontend", email) if use_cache else None
+    context = await (browser.new_context(storage_state=state) if state else browser.new_context())
+    # Belt and braces: even a misconfigured app can't sign in to or write production
+    for host in PRODUCTION_HOSTS:
+        await context.route(f"https://{host}/**", block_production)
+    page = await context.new_page()
+    try:
+        async def login():
+            await page.goto(config["url"])
+            if state:
+                await page.wait_for_selector(config["ready"], timeout=config["timeout"])
+            else:
+                await ui_login(page, config, email)
+        ok, _ = await stats.timed("login (cached)" if state else "login (ui)", login())
+        if not ok:
+            return
+
+        while time.perf_counter() < stop_at:
+            async def dashboard():
+                await page.click("[data-testid='nav-dashboard']")
+                await page.wait_for_selector("[data-testid^='project-card-']")
+            ok, _ = await stats.timed("ui.dashboard", dashboard())
+            await think(think_scale)
+            if not ok:
+                continue
+
+            async def mission_detail():
+                await page.locator("[data-testid^='project-card-']").nth(random.randrange(2)).click()
+                await page.wait_for_selector("text=Testing Scope")
+            ok, _ = await stats.timed("ui.mission_detail", mission_detail())
+            await think(think_scale)
+            if not ok:
+                continue
+
+            async def submit_report():
+                await page.click("[data-testid='submit-anomaly-btn']")
+                await page.wait_for_selector("[data-testid='anomaly-report-form']")
+                await page.click(f"[data-testid='severity-{random.choice(SEVERITIES).lower()}']")
+                await page.fill("[data-testid='anomaly-title']", f"Load test anomaly from scout {index}")
+                await page.fill("[data-testid='anomaly-description']", "Generated by load_testers.py")
+                await page.click("[data-testid='submit-report-btn']")
+                await page.wait_for_selector("text=Testing Scope")
+            await stats.timed("ui.submit_report", submit_report())
+            await think(think_scale)
+    finally:
+        await context.close()
+
+
+async def report_progress(stats, stop_at, interval=5):
+    last_ok, last_errors = 0, 0
+    while time.perf_counter() < stop_at:
+        await asyncio.sleep(interval)
+        ok, errors = stats.totals()
+        print(f"[{time.perf_counter() - stats.started:5.0f}s] {stats.active} testers, "
+              f"{(ok - last_ok) / interval:.1f} ops/s, {errors - last_errors} errors")
+        last_ok, last_errors = ok, errors
+
+
+async def ramp(make_tester, stats, testers, ramp_s, stop_at):
+    async def delayed(index):
+        await asyncio.sleep(ramp_s * index / max(testers, 1))
+        if time.perf_counter() >= stop_at:
+            return
+        stats.active += 1
+        try:
+            await make_tester(index)
+        finally:
+            stats.active -= 1
+
+    progress = asyncio.create_task(report_progress(stats, stop_at))
+    await asyncio.gather(*(delayed(i) for i in range(testers)))
+    progress.cancel()
+
+
+async def run(args):
+    stats = Stats()
+    stop_at = stats.started + args.ramp + args.duration
+
+    firestore = Firestore(EmulatorHttp(FIRESTORE_HOST, args.connections), args.project)
+    auth = AuthEmulator(EmulatorHttp(AUTH_HOST, args.connections), args.project)
+    if args.mode == "api":
+        await prepare_emulators(args, firestore, auth)
+        try:
+            await ramp(lambda i: api_tester(i, firestore, auth, stats, stop_at, args.think),
+                       stats, args.testers, args.ramp, stop_at)
+        finally:
+            firestore.http.close()
+            auth.http.close()
+    else:
+        # The UI testers log in as the frontend's demo accounts, which only
+        # exist in the Auth emulator once something has created them
+        if args.seed or args.reset:
+            try:
+                await prepare_emulators(args, firestore, auth, TARGETS["frontend"]["accounts"].items())
+            finally:
+                firestore.http.close()
+                auth.http.close()
+        from playwright.async_api import async_playwright
+        async with async_playwright() as p:
+            browser = await launch_browser(p, headless=not args.headed)
+            try:
+                backend = await app_backend(browser)
+                if backend is None:
+                    raise SystemExit(
+                        f"❌ {TARGETS['frontend']['url']} is wired to the production Firebase project. "
+                        "Start it with VITE_USE_EMULATORS=true (or VITE_DEMO_MODE=true) for --mode ui.")
+                print(f"App backend: {backend}")
+                # Cached logins point at accounts a reset has just deleted
+                await ramp(lambda i: ui_tester(i, browser, stats, stop_at, args.think, not args.reset),
+                           stats, args.testers, args.ramp, stop_at)
+            finally:
+                await browser.close()
+    return stats, time.perf_counter() - stats.started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent testers against the app or the emulators.")
+    parser.add_argument("--mode", choices=("api", "ui"), default="api",
+                        help="api: Firebase emulators directly; ui: browser flows on :3000 (default: api)")
+    parser.add_argument("--testers", type=int, default=100, help="virtual testers at full load (default: 100)")
+    parser.add_argument("--ramp", type=float, default=30, help="seconds to ramp up to full load (default: 30)")
+    parser.add_argument("--duration", type=float, default=60, help="seconds at full load (default: 60)")
+    parser.add_argument("--think", type=float, default=1.0,
+                        help="think-time multiplier between steps, 0 = none (default: 1)")
+    parser.add_argument("--project", default=default_project(), help="Firebase project id (default: .firebaserc)")
+    parser.add_argument("--seed", type=int, default=0, metavar="N",
+                        help="create N ACTIVE missions first; in ui mode also the frontend's demo accounts")
+    parser.add_argument("--reset", action="store_true",
+                        help="wipe emulator data before the run; in ui mode then recreate the demo accounts")
+    parser.add_argument("--connections", type=int, default=200, help="api: max open connections per emulator")
+    parser.add_argument("--headed", action="store_true", help="ui: show the browser")
+    args = parser.parse_args(argv)
+
+    print(f"Ramping to {args.testers} {args.mode} testers over {args.ramp:g}s, then {args.duration:g}s at full load...")
+    stats, elapsed = asyncio.run(run(args))
+    summary = stats.summary(elapsed)
+
+    width = max([len(k) for k in summary] + [9])
+    print(f"\n{'operation':<{width}}  {'count':>6}  {'ops/s':>7}  {'errors':>7}  {'p50':>8}  {'p95':>8}  {'p99':>8}")
+    for name, s in summary.items():
+        print(f"{name:<{width}}  {s['count']:>6}  {s['per_second']:>7.2f}  {s['error_rate']:>6.1%}  "
+              f"{s['p50']:>6.0f}ms  {s['p95']:>6.0f}ms  {s['p99']:>6.0f}ms")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = os.path.join(RESULTS_DIR, f"load-{args.mode}-{args.testers}-{int(time.time())}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"mode": args.mode, "testers": args.testers, "ramp_s": args.ramp, "duration_s": args.duration,
+                   "elapsed_s": round(elapsed, 1), "operations": summary}, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    failing = {name: s for name, s in summary.items() if s["error_rate"]}
+    for name, s in failing.items():
+        causes = ", ".join(f"{cause} x{count}" for cause, count in s["errors"].items())
+        print(f"❌ {name}: {s['error_rate']:.1%} errors ({causes})")
+    if not failing:
+        print("✅ No errors under load.")
+    return 1 if failing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
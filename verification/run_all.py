@@ -0,0 +1,162 @@
+import argparse
+import glob
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from playwright.sync_api import sync_playwright
+
+from shared_browser import CDP_ENV
+
+VERIFICATION_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(VERIFICATION_DIR)
+REPORTS_DIR = os.path.join(REPO_ROOT, "test_reports")
+
+# The checks report through print(); these mark a line as a failure or warning
+FAILURE_MARKERS = ("❌", "FAIL", "Error", "Timeout", "Traceback")
+WARNING_MARKERS = ("⚠️", "Warning")
+# Screenshots the checks point at: debug captures, and captures that differ
+# from their baseline (see visual.py)
+SCREENSHOT_PATTERN = re.compile(r"(?:verification|test_reports/visual)/[\w.-]+\.png")
+
+
+def discover_checks(only=None):
+    checks = sorted(glob.glob(os.path.join(VERIFICATION_DIR, "verify_*.py")))
+    if only:
+        checks = [c for c in checks if os.path.splitext(os.path.basename(c))[0] in only
+                  or os.path.basename(c) in only]
+    return checks
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_check(path, endpoint, timeout):
+    # Each check runs in its own process (its own Playwright driver and stdout),
+    # attached to the shared browser through CDP. Playwright's sync API is not
+    # thread-safe, so processes are what lets the checks run side by side.
+    name = os.path.splitext(os.path.basename(path))[0]
+    env = dict(os.environ, **{CDP_ENV: endpoint})
+    started = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            [sys.executable, path], cwd=REPO_ROOT, env=env,
+            capture_output=True, text=True, timeout=timeout,
+        )
+        output = proc.stdout + proc.stderr
+        returncode = proc.returncode
+    except subprocess.TimeoutExpired as e:
+        # Partial output comes back as bytes even with text=True
+        output = "".join(
+            part.decode(errors="replace") if isinstance(part, bytes) else part
+            for part in (e.stdout or "", e.stderr or "")
+        )
+        output += f"\nTimeout: check exceeded {timeout}s"
+        returncode = -1
+
+    lines = [line for line in output.splitlines() if line.strip()]
+    failures = [line for line in lines if any(m in line for m in FAILURE_MARKERS)]
+    warnings = [line for line in lines if any(m in line for m in WARNING_MARKERS)]
+    if returncode != 0 and not failures:
+        failures = lines[-5:] or [f"exited with code {returncode}"]
+
+    return {
+        "name": name,
+        "status": "failed" if failures else "warning" if warnings else "passed",
+        "failures": failures,
+        "warnings": warnings,
+        "screenshots": sorted(set(SCREENSHOT_PATTERN.findall(output))),
+        "duration_s": round(time.perf_counter() - started, 2),
+        "output": lines,
+    }
+
+
+def build_report(results, wall_time):
+    # Same shape as test_reports/iteration_1.json
+    passed = [r for r in results if r["status"] != "failed"]
+    failed = [r for r in results if r["status"] == "failed"]
+    percentage = round(100 * len(passed) / len(results)) if results else 0
+    summary = (f"Ran {len(results)} verification checks against one shared browser in "
+               f"{wall_time:.1f}s: {len(passed)} passed, {len(failed)} failed.")
+    return {
+        "summary": summary,
+        "backend_issues": {},
+        "frontend_issues": {r["name"]: r["failures"] for r in failed},
+        "passed_tests": [
+            r["name"] + (f" (warnings: {'; '.join(r['warnings'])})" if r["warnings"] else "")
+            for r in passed
+        ],
+        "test_report_links": sorted({s for r in results for s in r["screenshots"]}),
+        "action_item_for_main_agent": (
+            "Fix failing checks: " + ", ".join(r["name"] for r in failed) if failed else ""
+        ),
+        "updated_files": [],
+        "success_percentage": f"frontend: {percentage}%",
+        "should_call_test_agent_after_fix": "true" if failed else "false",
+        "should_main_agent_test_itself": "true",
+    }
+
+
+def next_report_path():
+    existing = glob.glob(os.path.join(REPORTS_DIR, "iteration_*.json"))
+    numbers = [int(m.group(1)) for m in (re.search(r"iteration_(\d+)\.json$", p) for p in existing) if m]
+    return os.path.join(REPORTS_DIR, f"iteration_{max(numbers, default=0) + 1}.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run every verification check against one shared browser.")
+    parser.add_argument("checks", nargs="*", help="check names to run (default: all verify_*.py)")
+    parser.add_argument("--workers", type=int, default=4, help="checks running in parallel (default: 4)")
+    parser.add_argument("--timeout", type=int, default=120, help="seconds allowed per check (default: 120)")
+    parser.add_argument("--headed", action="store_true", help="show the shared browser")
+    parser.add_argument("--output", help="report path (default: next test_reports/iteration_N.json)")
+    args = parser.parse_args(argv)
+
+    checks = discover_checks(args.checks)
+    if not checks:
+        print("❌ No verification checks found")
+        return 1
+
+    port = free_port()
+    endpoint = f"http://127.0.0.1:{port}"
+    print(f"Launching shared browser for {len(checks)} checks ({args.workers} workers)...")
+    started = time.perf_counter()
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=not args.headed,
+                                    args=[f"--remote-debugging-port={port}"])
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+                futures = [pool.submit(run_check, path, endpoint, args.timeout) for path in checks]
+                results = []
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    icon = {"passed": "✅", "warning": "⚠️", "failed": "❌"}[result["status"]]
+                    print(f"{icon} {result['name']} ({result['duration_s']}s)")
+                    for line in result["failures"]:
+                        print(f"    {line}")
+        finally:
+            browser.close()
+    wall_time = time.perf_counter() - started
+    results.sort(key=lambda r: r["name"])
+
+    report = build_report(results, wall_time)
+    output = args.output or next_report_path()
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(report["summary"])
+    print(f"Report saved to {os.path.relpath(output, REPO_ROOT)}")
+    return 0 if not report["frontend_issues"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
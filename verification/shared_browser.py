@@ -0,0 +1,14 @@
+import os
+
+# Set by run_all.py: the CDP endpoint of the one Chromium shared by every check
+CDP_ENV = "BETAMAX_CDP_ENDPOINT"
+
+
+def launch_browser(p, **kwargs):
+    # Attach to the runner's shared browser when there is one, otherwise launch
+    # a private Chromium so each script still works on its own. Closing a
+    # CDP-attached browser only drops this script's contexts.
+    endpoint = os.environ.get(CDP_ENV)
+    if endpoint:
+        return p.chromium.connect_over_cdp(endpoint)
+    return p.chromium.launch(**kwargs)
@@ -0,0 +1,128 @@
+import argparse
+import glob
+import json
+import os
+import sys
+
+from tracing import TRACE_DIR
+
+# A step regresses when its p95 is both TOLERANCE slower (relative) and
+# MIN_DELTA_MS slower (absolute) than the baseline; the absolute floor keeps
+# 3ms -> 5ms jitter on trivial steps from raising alarms.
+TOLERANCE = 0.2
+MIN_DELTA_MS = 50
+
+
+def load_traces(paths, runs=None):
+    entries = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entries.append(json.loads(line))
+
+    if runs:
+        # Keep only the most recent N runs of each script
+        latest = {}
+        for entry in sorted(entries, key=lambda e: e["ts"]):
+            run_ids = latest.setdefault(entry["script"], [])
+            if entry["run_id"] not in run_ids:
+                run_ids.append(entry["run_id"])
+        keep = {run_id for run_ids in latest.values() for run_id in run_ids[-runs:]}
+        entries = [e for e in entries if e["run_id"] in keep]
+    return entries
+
+
+def percentile(values, pct):
+    # Linear interpolation between closest ranks
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(entries):
+    groups = {}
+    for entry in entries:
+        groups.setdefault(f"{entry['script']} :: {entry['step']}", []).append(entry)
+
+    summary = {}
+    for key, group in sorted(groups.items()):
+        durations = [e["duration_ms"] for e in group]
+        summary[key] = {
+            "count": len(durations),
+            "runs": len({e["run_id"] for e in group}),
+            "failures": sum(1 for e in group if not e.get("ok", True)),
+            "p50": round(percentile(durations, 50), 1),
+            "p95": round(percentile(durations, 95), 1),
+            "max": round(max(durations), 1),
+        }
+    return summary
+
+
+def compare(summary, baseline, tolerance=TOLERANCE, min_delta_ms=MIN_DELTA_MS):
+    regressions = []
+    for key, stats in summary.items():
+        before = baseline.get(key)
+        if not before:
+            continue
+        delta = stats["p95"] - before["p95"]
+        if delta > min_delta_ms and stats["p95"] > before["p95"] * (1 + tolerance):
+            regressions.append((key, before["p95"], stats["p95"]))
+    return regressions
+
+
+def print_table(summary, regressed=()):
+    width = max([len(k) for k in summary] + [4])
+    print(f"{'step':<{width}}  {'n':>5}  {'p50':>9}  {'p95':>9}  {'max':>9}  fail")
+    for key, stats in summary.items():
+        flag = "  ⚠️ regressed" if key in regressed else ""
+        print(f"{key:<{width}}  {stats['count']:>5}  {stats['p50']:>7.1f}ms  {stats['p95']:>7.1f}ms  "
+              f"{stats['max']:>7.1f}ms  {stats['failures']:>4}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize per-step latency traces.")
+    parser.add_argument("traces", nargs="*", help=f"JSONL trace files (default: {TRACE_DIR}/*.jsonl)")
+    parser.add_argument("--runs", type=int, help="only use the most recent N runs of each script")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write this summary as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"relative p95 slowdown that counts as a regression (default: {TOLERANCE})")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    paths = args.traces or sorted(glob.glob(os.path.join(TRACE_DIR, "*.jsonl")))
+    entries = load_traces(paths, args.runs)
+    if not entries:
+        print("No trace entries found.")
+        return 1
+    summary = summarize(entries)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(summary, json.load(f), args.tolerance)
+
+    if args.json:
+        print(json.dumps({"summary": summary, "regressions": regressions}, indent=2))
+    else:
+        print_table(summary, {key for key, _, _ in regressions})
+        for key, before, after in regressions:
+            print(f"❌ {key}: p95 {before:.0f}ms -> {after:.0f}ms")
+        if args.baseline and not regressions:
+            print("✅ No regressions against baseline.")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
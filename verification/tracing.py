@@ -0,0 +1,99 @@
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+# Per-step latency traces, one JSONL file per script. trace_report.py turns
+# them into p50/p95/max tables and compares them against a baseline.
+TRACE_DIR = os.environ.get(
+    "BETAMAX_TRACE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_reports", "traces"),
+)
+
+# Page methods timed automatically; the first argument (selector or URL) names the step
+TRACED_METHODS = (
+    "goto", "reload", "go_back", "click", "fill", "press", "type", "check",
+    "wait_for_selector", "wait_for_load_state", "wait_for_url", "wait_for_timeout",
+)
+
+
+class Tracer:
+    def __init__(self, script, trace_dir=TRACE_DIR):
+        self.script = os.path.splitext(os.path.basename(script))[0]
+        self.run_id = uuid.uuid4().hex[:12]
+        os.makedirs(trace_dir, exist_ok=True)
+        self.path = os.path.join(trace_dir, f"{self.script}.jsonl")
+        self._labels = []
+
+    def record(self, step, duration_ms, ok=True, **tags):
+        entry = {
+            "ts": time.time(),
+            "run_id": self.run_id,
+            "script": self.script,
+            "step": step,
+            "duration_ms": round(duration_ms, 2),
+            "ok": ok,
+        }
+        if self._labels:
+            tags.setdefault("within", "/".join(self._labels))
+        if tags:
+            entry["tags"] = tags
+        # Append per line so parallel runs of the same script interleave safely
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    @contextmanager
+    def step(self, name, **tags):
+        # Times a named phase ("login", "tab:changelog") around any number of calls
+        started = time.perf_counter()
+        self._labels.append(name)
+        ok = True
+        try:
+            yield
+        except BaseException:
+            ok = False
+            raise
+        finally:
+            self._labels.pop()
+            self.record(name, (time.perf_counter() - started) * 1000, ok, **tags)
+
+    def sleep(self, seconds):
+        # Stand-in for time.sleep() so fixed waits show up in the trace too
+        with self.step(f"sleep {seconds}s"):
+            time.sleep(seconds)
+
+    def wrap(self, page):
+        return TracedPage(page, self)
+
+
+class TracedPage:
+    # Delegates everything to the real Page, timing the calls in TRACED_METHODS
+
+    def __init__(self, page, tracer):
+        self._page = page
+        self._tracer = tracer
+
+    @property
+    def unwrapped(self):
+        return self._page
+
+    def __getattr__(self, name):
+        attr = getattr(self._page, name)
+        if name not in TRACED_METHODS or not callable(attr):
+            return attr
+
+        def traced(*args, **kwargs):
+            target = args[0] if args else ""
+            step = f"{name} {target}".strip()
+            started = time.perf_counter()
+            ok = True
+            try:
+                return attr(*args, **kwargs)
+            except BaseException:
+                ok = False
+                raise
+            finally:
+                self._tracer.record(step, (time.perf_counter() - started) * 1000, ok)
+
+        return traced
@@ -1,25 +1,21 @@
 from playwright.sync_api import sync_playwright
-import time
+
+from auth_fixtures import logged_in_page
+from shared_browser import launch_browser
+from tracing import Tracer
+from visual import VisualCheck
 
 def verify_a11y():
+    tracer = Tracer(__file__)
+    visual = VisualCheck(__file__)
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-
-        # Navigate to app
-        page.goto("http://localhost:3000/")
-
-        # Login
-        page.get_by_test_id("email-input").fill("neo@betamax.io")
-        page.get_by_test_id("password-input").fill("anything")
-        page.get_by_test_id("login-submit-btn").click()
+        browser = launch_browser(p, headless=True)
 
-        # Wait for dashboard
-        page.wait_for_selector("text=THE_DECK")
+        # Navigate to app, logged in as neo (cached login, UI login only if stale)
+        page = logged_in_page(browser, "frontend", "neo@betamax.io", tracer)
 
-        # Take screenshot of Dashboard with sidebar
-        page.screenshot(path="verification/dashboard_sidebar.png")
-        print("📸 Screenshot saved to verification/dashboard_sidebar.png")
+        # Compare Dashboard with sidebar against its baseline
+        visual.capture(page, "dashboard_sidebar")
 
         # Check Sound Toggle in Sidebar
         sound_btn = page.locator("aside button:has(.lucide-volume-2, .lucide-volume-x)")
@@ -34,14 +30,14 @@ def verify_a11y():
                 print("❌ Sound toggle MISSING aria-label")
 
         # Navigate to Mission Detail
-        page.click("[data-testid^='project-card-']")
+        with tracer.step("open mission detail"):
+            page.click("[data-testid^='project-card-']")
 
-        # Wait for detail page
-        page.wait_for_selector("text=Testing Scope")
+            # Wait for detail page
+            page.wait_for_selector("text=Testing Scope")
 
-        # Take screenshot of Mission Detail
-        page.screenshot(path="verification/mission_detail.png")
-        print("📸 Screenshot saved to verification/mission_detail.png")
+        # Compare Mission Detail against its baseline
+        visual.capture(page, "mission_detail")
 
         # Check Back Button
         back_btn = page.locator("button:has(.lucide-arrow-left)")
@@ -56,6 +52,7 @@ def verify_a11y():
                 print("❌ Back button MISSING aria-label")
 
         browser.close()
+    visual.close()
 
 if __name__ == "__main__":
     verify_a11y()
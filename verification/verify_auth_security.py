@@ -1,9 +1,13 @@
 from playwright.sync_api import sync_playwright, expect
 
+from shared_browser import launch_browser
+from tracing import Tracer
+
 def run():
+    tracer = Tracer(__file__)
     with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
+        browser = launch_browser(p)
+        page = tracer.wrap(browser.new_page())
 
         # Navigate to app
         try:
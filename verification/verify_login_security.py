@@ -1,11 +1,16 @@
 from playwright.sync_api import sync_playwright, expect
-import time
+
+from shared_browser import launch_browser
+from tracing import Tracer
+from visual import VisualCheck
 
 def run():
     print("Starting Login Security Verification...")
+    tracer = Tracer(__file__)
+    visual = VisualCheck(__file__)
     with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
+        browser = launch_browser(p)
+        page = tracer.wrap(browser.new_page())
 
         # Navigate to app
         try:
@@ -36,7 +41,7 @@ def run():
 
         # Wait a bit for potential async login (simulating real network if needed, or local async)
         # The app has a 800ms delay
-        time.sleep(2)
+        tracer.sleep(2)
 
         # Expect to stay on login screen or see error
         # If login succeeded, we would see "THE_DECK" (Dashboard title)
@@ -47,7 +52,7 @@ def run():
             error_visible = page.is_visible("text=Access denied")
             if error_visible:
                  print("✅ SUCCESS: Login failed as expected for wrong password.")
-                 page.screenshot(path="verification/login_failed.png")
+                 visual.capture(page, "login_failed")
             else:
                  print("⚠️ WARNING: Login failed but no error message found?")
 
@@ -64,11 +69,12 @@ def run():
             try:
                 page.wait_for_selector("text=THE_DECK", timeout=5000)
                 print("✅ SUCCESS: Logged in with correct password.")
-                page.screenshot(path="verification/login_success.png")
+                visual.capture(page, "login_success")
             except:
                 print("❌ FAILURE: Could not log in with correct password.")
 
         browser.close()
+    visual.close()
     print("Verification complete.")
 
 if __name__ == "__main__":
@@ -1,9 +1,15 @@
 from playwright.sync_api import sync_playwright, expect
 
+from shared_browser import launch_browser
+from tracing import Tracer
+from visual import VisualCheck
+
 def run():
+    tracer = Tracer(__file__)
+    visual = VisualCheck(__file__)
     with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
+        browser = launch_browser(p)
+        page = tracer.wrap(browser.new_page())
 
         # Navigate to app
         try:
@@ -28,9 +34,8 @@ def run():
         input_el = page.locator("#auth-password")
         expect(input_el).to_have_attribute("type", "password")
 
-        # Take screenshot of masked password
-        page.screenshot(path="verification/password_masked.png")
-        print("Screenshot masked taken")
+        # Compare masked password against its baseline
+        visual.capture(page, "password_masked")
 
         # Click toggle
         page.click("button[aria-label='Show password']")
@@ -38,11 +43,11 @@ def run():
         # Verify type is text
         expect(input_el).to_have_attribute("type", "text")
 
-        # Take screenshot of visible password
-        page.screenshot(path="verification/password_visible.png")
-        print("Screenshot visible taken")
+        # Compare visible password against its baseline
+        visual.capture(page, "password_visible")
 
         browser.close()
+    visual.close()
 
 if __name__ == "__main__":
     run()
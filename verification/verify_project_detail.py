@@ -1,28 +1,23 @@
 from playwright.sync_api import sync_playwright, expect
 
+from auth_fixtures import logged_in_page
+from shared_browser import launch_browser
+from tracing import Tracer
+from visual import VisualCheck
+
 def run():
+    tracer = Tracer(__file__)
+    visual = VisualCheck(__file__)
     with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-
-        # Navigate to app
-        try:
-            page.goto("http://localhost:5173")
-        except Exception as e:
-            print(f"Error navigating: {e}")
-            return
+        browser = launch_browser(p)
 
-        # Login
+        # Navigate to app and login (cached; UI login only if stale)
         print("Logging in...")
         try:
-            page.wait_for_selector("text=Beta Max", timeout=5000)
-            page.fill("#auth-email", "alex@test.com")
-            page.fill("#auth-password", "password")
-            page.click("button:has-text('Sign In')")
-            page.wait_for_selector("text=Dashboard", timeout=5000)
+            page = logged_in_page(browser, "portal", "alex@test.com", tracer)
         except Exception as e:
+            # logged_in_page saves verification/debug_login_error.png on failure
             print(f"Error logging in: {e}")
-            page.screenshot(path="verification/debug_login_error.png")
             browser.close()
             return
 
@@ -31,10 +26,11 @@ def run():
         # Click first project
         print("Navigating to project...")
         try:
-            page.click("text=Neon Wallet")
-            page.wait_for_selector("text=Neon Wallet", timeout=5000)
-            # Verify Overview tab is active by default
-            expect(page.locator("text=Description")).to_be_visible()
+            with tracer.step("open project"):
+                page.click("text=Neon Wallet")
+                page.wait_for_selector("text=Neon Wallet", timeout=5000)
+                # Verify Overview tab is active by default
+                expect(page.locator("text=Description")).to_be_visible()
             expect(page.locator("text=Testing Scope")).to_be_visible()
             expect(page.locator("text=Biometric Login")).to_be_visible()
             print("Overview tab verified.")
@@ -47,10 +43,11 @@ def run():
         # Click Changelog tab
         print("Switching to Changelog...")
         try:
-            page.click("button:has-text('changelog')")
-            # Verify changelog content
-            # Scoping to make sure we find the list item
-            expect(page.locator("li", has_text="Added biometric login flow")).to_be_visible()
+            with tracer.step("tab switch: changelog"):
+                page.click("button:has-text('changelog')")
+                # Verify changelog content
+                # Scoping to make sure we find the list item
+                expect(page.locator("li", has_text="Added biometric login flow")).to_be_visible()
             print("Changelog tab verified.")
         except Exception as e:
             print(f"Error verifying changelog: {e}")
@@ -61,9 +58,10 @@ def run():
         # Click Feedback tab
         print("Switching to Feedback...")
         try:
-            page.click("button:has-text('feedback')")
-            # Verify feedback content
-            expect(page.locator("text=Community Reports")).to_be_visible()
+            with tracer.step("tab switch: feedback"):
+                page.click("button:has-text('feedback')")
+                # Verify feedback content
+                expect(page.locator("text=Community Reports")).to_be_visible()
             expect(page.locator("h4", has_text="Crash on launch when offline")).to_be_visible()
             print("Feedback tab verified.")
         except Exception as e:
@@ -73,8 +71,9 @@ def run():
             return
 
         print("Verification passed!")
-        page.screenshot(path="verification/project_detail.png")
+        visual.capture(page, "project_detail")
         browser.close()
+    visual.close()
 
 if __name__ == "__main__":
     run()
@@ -1,29 +1,30 @@
 from playwright.sync_api import sync_playwright
 
+from auth_fixtures import logged_in_page
+from shared_browser import launch_browser
+from tracing import Tracer
+from visual import VisualCheck
+
 def verify_selectors():
+    tracer = Tracer(__file__)
+    visual = VisualCheck(__file__)
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+        browser = launch_browser(p, headless=True)
+        page = None
 
         try:
-            # 1. Login
-            print("Navigating to login...")
-            page.goto("http://localhost:5173/")
-            page.fill("#auth-email", "alex@test.com")
-            page.fill("#auth-password", "password")
-            page.click("button:has-text('Sign In')")
-
-            # Wait for dashboard
-            print("Waiting for dashboard...")
-            page.wait_for_selector("text=Dashboard")
+            # 1. Login (cached; UI login only if stale)
+            print("Opening dashboard...")
+            page = logged_in_page(browser, "portal", "alex@test.com", tracer)
 
             # 2. Go to Feedback Form
             print("Navigating to feedback form...")
-            page.click("button[aria-label='Add feedback']")
+            with tracer.step("open feedback form"):
+                page.click("button[aria-label='Add feedback']")
 
-            # Wait for form
-            print("Waiting for form...")
-            page.wait_for_selector("text=Submit Feedback")
+                # Wait for form
+                print("Waiting for form...")
+                page.wait_for_selector("text=Submit Feedback")
 
             # 3. Verify TypeSelector (Initially Bug is selected)
             bug_button = page.locator("button:has-text('Bug Report')")
@@ -45,7 +46,8 @@ def verify_selectors():
 
             # 5. Toggle to Suggestion
             print("Switching to Suggestion...")
-            suggestion_button.click()
+            with tracer.step("switch to suggestion"):
+                suggestion_button.click()
             print(f"Suggestion Button Checked after click: {suggestion_button.get_attribute('aria-checked')}")
             print(f"Bug Button Checked after click: {bug_button.get_attribute('aria-checked')}")
 
@@ -56,16 +58,17 @@ def verify_selectors():
             else:
                 print("Warning: Severity Selector still visible.")
 
-            # Take screenshot
-            page.screenshot(path="verification/selectors_verification.png")
-            print("Screenshot saved to verification/selectors_verification.png")
+            # Compare against the baseline
+            visual.capture(page, "selectors_verification")
 
         except Exception as e:
             print(f"Error: {e}")
-            page.screenshot(path="verification/error.png")
+            if page is not None:
+                page.screenshot(path="verification/error.png")
             raise e
         finally:
             browser.close()
+            visual.close()
 
 if __name__ == "__main__":
     verify_selectors()
@@ -0,0 +1,207 @@
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, ImageChops
+except ImportError:
+    # Optional: without Pillow the checks still run, only the comparison is skipped
+    Image = ImageChops = None
+
+# Screenshot baselines. A capture is compared with the stored baseline and
+# written to disk only if it differs: first the exact PNG digest, then a
+# perceptual hash, and only when the hashes differ a tile-by-tile pixel diff to
+# find the changed regions. Baselines are the screenshot bytes exactly as
+# captured, never re-encoded, so an identical capture hits the digest without
+# being decoded. Decoding and diffing happen in a thread pool so the check keeps
+# driving the browser meanwhile. The .json sidecars next to the baselines only
+# cache their digests; they are derived from the PNGs on demand and git-ignored.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+REPORT_DIR = os.path.join(ROOT, "test_reports", "visual")
+# Set to 1 to accept changed captures as the new baselines
+UPDATE_ENV = "BETAMAX_UPDATE_BASELINES"
+
+HASH_SIZE = 32        # dHash grid; 32x32 = 1024 bits catches a changed word or icon
+TILE = 64             # pixel-diff region size
+PIXEL_TOLERANCE = 16  # per-channel delta ignored as antialiasing noise
+NOISE_RATIO = 0.0005  # share of changed pixels still reported as unchanged
+
+
+def dhash(image, size=HASH_SIZE):
+    # Difference hash: brightness gradient between horizontal neighbours
+    small = image.convert("L").resize((size + 1, size), Image.BILINEAR)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return f"{bits:0{size * size // 4}x}"
+
+
+def hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def changed_regions(before, after, tile=TILE, tolerance=PIXEL_TOLERANCE):
+    # Returns (changed pixel count, [x, y, w, h] boxes of changed tiles merged per row run)
+    if before.size != after.size:
+        width, height = after.size
+        return width * height, [[0, 0, width, height]]
+
+    diff = ImageChops.difference(before.convert("RGB"), after.convert("RGB")).convert("L")
+    mask = diff.point(lambda v: 255 if v > tolerance else 0)
+    if mask.getbbox() is None:
+        return 0, []
+
+    width, height = after.size
+    changed = 0
+    boxes = []
+    for y in range(0, height, tile):
+        run = None
+        for x in range(0, width, tile):
+            box = (x, y, min(x + tile, width), min(y + tile, height))
+            count = mask.crop(box).histogram()[255]
+            if count:
+                changed += count
+                if run and run[0] + run[2] == x:
+                    run[2] += box[2] - x
+                else:
+                    run = [x, y, box[2] - x, box[3] - y]
+                    boxes.append(run)
+            else:
+                run = None
+    return changed, boxes
+
+
+def _write(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class VisualCheck:
+    def __init__(self, script, workers=None, update=None):
+        self.script = os.path.splitext(os.path.basename(script))[0]
+        self.update = os.environ.get(UPDATE_ENV) == "1" if update is None else update
+        self._pool = ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 1))
+        self._pending = []
+        self.results = []
+
+    def capture(self, page, name, **screenshot_options):
+        # Grabs the PNG on the calling thread and queues the comparison
+        if Image is None:
+            if not self.results:
+                print("⚠️ Pillow is not installed (pip install pillow); skipping visual comparisons")
+            self.results.append({"name": name, "script": self.script, "status": "skipped"})
+            return
+        data = page.screenshot(**screenshot_options)
+        self._pending.append(self._pool.submit(self._compare, name, data))
+        print(f"📸 Captured {name}")
+
+    def _meta_path(self, name):
+        return os.path.join(BASELINE_DIR, f"{name}.json")
+
+    def _load_meta(self, name):
+        baseline = os.path.join(BASELINE_DIR, f"{name}.png")
+        if not os.path.exists(baseline):
+            return None
+        try:
+            with open(self._meta_path(name), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Baseline without a sidecar (e.g. added by hand): hash it once
+            with open(baseline, "rb") as f:
+                data = f.read()
+            meta = self._save_meta(name, data, Image.open(io.BytesIO(data)))
+            return meta
+
+    def _save_meta(self, name, data, image):
+        meta = {"sha256": hashlib.sha256(data).hexdigest(), "dhash": dhash(image), "size": list(image.size)}
+        _write(self._meta_path(name), json.dumps(meta).encode("utf-8"))
+        return meta
+
+    def _accept(self, name, data, image):
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        _write(os.path.join(BASELINE_DIR, f"{name}.png"), data)
+        self._save_meta(name, data, image)
+
+    def _compare(self, name, data):
+        started = time.perf_counter()
+        result = {"name": name, "script": self.script}
+        meta = self._load_meta(name)
+
+        if meta and meta["sha256"] == hashlib.sha256(data).hexdigest():
+            result["status"] = "unchanged"
+        else:
+            image = Image.open(io.BytesIO(data))
+            image.load()
+            digest = dhash(image)
+            if meta is None:
+                self._accept(name, data, image)
+                result["status"] = "new"
+            elif meta["dhash"] == digest and meta["size"] == list(image.size):
+                result["status"] = "unchanged"
+            else:
+                result["hash_distance"] = hamming(meta["dhash"], digest)
+                with Image.open(os.path.join(BASELINE_DIR, f"{name}.png")) as baseline:
+                    changed, regions = changed_regions(baseline, image)
+                ratio = changed / (image.size[0] * image.size[1])
+                result["changed_pct"] = round(ratio * 100, 3)
+                if ratio <= NOISE_RATIO:
+                    result["status"] = "unchanged"
+                else:
+                    result["regions"] = regions[:20]
+                    if self.update:
+                        self._accept(name, data, image)
+                        result["status"] = "updated"
+                    else:
+                        # Keep the capture (only this one) so the change can be inspected
+                        os.makedirs(REPORT_DIR, exist_ok=True)
+                        path = os.path.join(REPORT_DIR, f"{name}.png")
+                        _write(path, data)
+                        result["status"] = "changed"
+                        result["capture"] = os.path.relpath(path, ROOT)
+        result["ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    def close(self):
+        # Waits for queued comparisons, prints them and appends them to the report
+        self.results += [future.result() for future in self._pending]
+        self._pending = []
+        self._pool.shutdown()
+
+        for result in self.results:
+            status = result["status"]
+            if status == "changed":
+                print(f"❌ {result['name']}: {result['changed_pct']}% of pixels changed in "
+                      f"{len(result['regions'])} regions -> {result['capture']}")
+            elif status == "updated":
+                print(f"⚠️ {result['name']}: baseline updated ({result['changed_pct']}% changed)")
+            elif status == "new":
+                print(f"✅ {result['name']}: new baseline saved to "
+                      f"{os.path.relpath(os.path.join(BASELINE_DIR, result['name'] + '.png'), ROOT)}, commit it")
+            elif status == "skipped":
+                continue
+            else:
+                print(f"✅ {result['name']}: matches baseline")
+
+        if any(r["status"] != "skipped" for r in self.results):
+            os.makedirs(REPORT_DIR, exist_ok=True)
+            ts = time.time()
+            with open(os.path.join(REPORT_DIR, "report.jsonl"), "a", encoding="utf-8") as f:
+                for result in self.results:
+                    f.write(json.dumps(dict(result, ts=ts)) + "\n")
+        return [r for r in self.results if r["status"] == "changed"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()